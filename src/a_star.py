@@ -4,42 +4,231 @@ A* algorithm that calculates the optimal path from source to destination.
 Author: Nicholas Butzke
 """
 
+from math import inf
+from time import perf_counter
+from bucket_queue import HeapQueue
+from feasibility import infeasibility_reason
+from instrumentation import timed_children, timed_heuristic
 from node import Node
-import heapq
+from search_result import SearchResult
 
 
-def a_star(start_state: Node, goal_state: Node):
+def a_star(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=None,
+    observer=None,
+    state_key=None,
+    closed_set=None,
+    open_list=None,
+    precheck=True,
+):
     """
     A* Algorithm
     Finds the shortest path from a source to a destination using heuristics
     Arg1: destination node                                                    | Node
+    Arg2: function that sets h_score and f_score of a node for a goal board.
+        Defaults to Node.calc_heuristic ignoring the side to move             | Callable
+    Arg3: optional instrumentation.SearchObserver, None disables it           | SearchObserver
+    Arg4: function mapping a board to its duplicate detection key, such as
+        symmetry.SymmetryKey(goal, match_turn=False). None uses board.state_key | Callable
+    Arg5: container for the closed state keys, such as a
+        disk_closed_set.DiskClosedSet to cap memory. None uses a set()        | set[int]
+    Arg6: empty open list with push/pop, such as a bucket_queue.BucketQueue.
+        None uses a HeapQueue of (f_score, node)                              | HeapQueue
+    Arg7: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                       | Bool
 
     Return: Optimal path if one is found. Otherwise will report no path found | list[Node]
     """
-    open_heap: heapq = []
-    heapq.heappush(open_heap, (0, start_state))
-    open_set: set[Node] = set()
-    open_set.add(start_state)
-    closed_set: set[Node] = set()
-    while open_heap:
+    if heuristic is None:
+
+        def heuristic(node, goal_board):
+            # goal test below ignores the side to move
+            node.calc_heuristic(goal_board, match_turn=False)
+
+    if state_key is None:
+
+        def state_key(board):
+            return board.state_key
+
+    if precheck and infeasibility_reason(
+        start_state.board, goal_state.board, match_turn=False
+    ):
+        return "no path found"
+    if open_list is None:
+        open_list = HeapQueue()
+    open_list.push(0, start_state)
+    # state keys of the open and closed nodes
+    open_set: set[int] = set()
+    open_set.add(state_key(start_state.board))
+    if closed_set is None:
+        closed_set = set()
+    while open_list:
         # current_node = min(open_list, key=lambda node: node.f_score)
         current_node: Node
-        _, current_node = heapq.heappop(open_heap)
-        open_set.remove(current_node)
-        current_node.make_children()
-        for child in current_node.children:
-            if child.board.board_state == goal_state.board.board_state:
+        _, current_node = open_list.pop()
+        current_key = state_key(current_node.board)
+        open_set.remove(current_key)
+        if observer is None:
+            children = current_node.iter_children()
+        else:
+            observer.on_expand(current_node, len(open_list), len(closed_set))
+            children = timed_children(current_node, observer)
+        for child in children:
+            if child.board.same_pieces(goal_state.board):
                 optimal_path = [goal_state]
                 while current_node is not None:
                     optimal_path.append(current_node)
                     current_node = current_node.parent
                 # print(f"Closed List Length: {len(closed_set)}")
+                if observer is not None:
+                    observer.on_goal(child)
                 return optimal_path[::-1]
-            child.calc_heuristic(goal_state.board)
+            if observer is None:
+                heuristic(child, goal_state.board)
+            else:
+                timed_heuristic(heuristic, child, goal_state.board, observer)
             # child.calc_heuristic_old()
-            if child not in open_set:
-                if child not in closed_set:
-                    heapq.heappush(open_heap, (child.f_score, child))
-                    open_set.add(child)
-        closed_set.add(current_node)
+            child_key = state_key(child.board)
+            if child_key not in open_set:
+                if child_key not in closed_set:
+                    open_list.push(child.f_score, child, child.h_score)
+                    open_set.add(child_key)
+                elif observer is not None:
+                    observer.on_prune(child, "closed")
+            elif observer is not None:
+                observer.on_prune(child, "open")
+        closed_set.add(current_key)
     return "no path found"
+
+
+def a_star_search(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=Node.calc_heuristic,
+    observer=None,
+    weight=1,
+    upper_bound=inf,
+    max_expansions=None,
+    deadline=None,
+    state_key=None,
+    open_list=None,
+    precheck=True,
+    closed_set=None,
+):
+    """
+    Production A* Algorithm
+    Goal test covers the side to move as well as the pieces.
+    The best g found for every state is tracked, a cheaper path to a state
+    pushes it again and the stale heap entry is skipped when popped (lazy decrease-key).
+    States that were already expanded are reopened only if reached more cheaply.
+    Heap ties are broken by lower h then insertion order so runs are reproducible.
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: function that sets h_score and f_score of a node for a goal board   | Callable
+    Arg4: optional instrumentation.SearchObserver, None disables it           | SearchObserver
+    Arg5: heuristic weight, nodes are ordered by g + weight * h.
+        Above 1 the path found costs at most weight times the optimum         | #
+    Arg6: only paths cheaper than this are wanted, children with
+        g + h >= upper_bound are cut                                          | #
+    Arg7: stop after this many expansions, None for no limit                  | #
+    Arg8: stop once time.perf_counter() passes this value, None for no limit  | #
+    Arg9: function mapping a board to its duplicate detection key, such as
+        symmetry.SymmetryKey(goal). None uses board.state_key                 | Callable
+    Arg10: empty open list with push/pop, such as a bucket_queue.BucketQueue.
+        Buckets need integer priorities, so weight must be a whole number.
+        None uses a HeapQueue ordered by f, then h, then insertion            | HeapQueue
+    Arg11: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                       | Bool
+    Arg12: empty mapping for the best g per state key, such as a
+        disk_closed_set.DiskScoreMap to cap memory. None uses a dict()        | dict[int, int]
+
+    Return: path, cost and expanded/generated counts                          | SearchResult
+        stats["budget_exhausted"] is True when a limit stopped the search
+        stats["infeasible"] holds the reason when the precheck ruled it out
+    """
+    if state_key is None:
+
+        def state_key(board):
+            return board.state_key
+
+    goal_board = goal_state.board
+    reason = infeasibility_reason(start_state.board, goal_board) if precheck else None
+    if reason is not None:
+        return SearchResult(
+            None,
+            0,
+            0,
+            {"stale_pops": 0, "budget_exhausted": False, "infeasible": reason},
+        )
+    heuristic(start_state, goal_board)
+    if open_list is None:
+        open_list = HeapQueue(tie_break_h=True)
+    open_list.push(
+        start_state.g_score + weight * start_state.h_score,
+        start_state,
+        start_state.h_score,
+    )
+    # Best g per state key, doubles as the g-aware closed set
+    best_g: dict[int, int] = {} if closed_set is None else closed_set
+    best_g[state_key(start_state.board)] = 0
+    expanded = 0
+    generated = 0
+    stale = 0
+    while open_list:
+        if (max_expansions is not None and expanded >= max_expansions) or (
+            deadline is not None and perf_counter() > deadline
+        ):
+            return SearchResult(
+                None,
+                expanded,
+                generated,
+                {"stale_pops": stale, "budget_exhausted": True},
+            )
+        current_node: Node
+        _, current_node = open_list.pop()
+        if current_node.g_score > best_g[state_key(current_node.board)]:
+            stale += 1  # a cheaper copy of this state was pushed after this one
+            continue
+        if current_node.board == goal_board:
+            if observer is not None:
+                observer.on_goal(current_node)
+            optimal_path = []
+            while current_node is not None:
+                optimal_path.append(current_node)
+                current_node = current_node.parent
+            return SearchResult(
+                optimal_path[::-1],
+                expanded,
+                generated,
+                {"stale_pops": stale, "budget_exhausted": False},
+            )
+        expanded += 1
+        if observer is None:
+            children = current_node.iter_children()
+        else:
+            observer.on_expand(current_node, len(open_list), len(best_g))
+            children = timed_children(current_node, observer)
+        for child in children:
+            generated += 1
+            child_key = state_key(child.board)
+            if child.g_score >= best_g.get(child_key, inf):
+                if observer is not None:
+                    observer.on_prune(child, "duplicate")
+                continue
+            best_g[child_key] = child.g_score
+            if observer is None:
+                heuristic(child, goal_board)
+            else:
+                timed_heuristic(heuristic, child, goal_board, observer)
+            if child.f_score >= upper_bound:
+                if observer is not None:
+                    observer.on_prune(child, "bound")
+                continue
+            open_list.push(
+                child.g_score + weight * child.h_score, child, child.h_score
+            )
+    return SearchResult(
+        None, expanded, generated, {"stale_pops": stale, "budget_exhausted": False}
+    )
@@ -0,0 +1,102 @@
+"""
+Anytime weighted A* that trades path quality for latency.
+Runs a_star_search with a high heuristic weight first, which finds a path almost
+immediately (calc_heuristic_old noted that a x2 weight took the 3x3 run from ~30s to
+nearly instant), then reruns with lower weights, only looking for cheaper paths,
+until the weight reaches 1 or the time/expansion budget runs out.
+"""
+
+from math import inf
+from time import perf_counter
+from a_star import a_star_search
+from node import Node
+from search_result import SearchResult
+
+DEFAULT_WEIGHTS = (2.0, 1.5, 1.25, 1.0)
+
+
+def anytime_a_star(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=Node.calc_heuristic,
+    weights=DEFAULT_WEIGHTS,
+    time_limit=None,
+    max_expansions=None,
+    on_solution=None,
+):
+    """
+    Anytime Weighted A* Algorithm
+    A run with weight w that finds a path proves that path is within w times the
+    optimum. A run that ends without beating the incumbent proves the incumbent
+    optimal, because children that can't beat it were the only ones cut.
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: admissible heuristic with the Node.calc_heuristic signature         | Callable
+    Arg4: weights to run, highest first, ending at 1 to finish with a proof  | tuple[#]
+    Arg5: wall clock budget in seconds, None for no limit                     | #
+    Arg6: total expansion budget, None for no limit                           | #
+    Arg7: called as on_solution(result) each time a cheaper path is found     | Callable
+
+    Return: best path found with its counts                                   | SearchResult
+        stats["bound"] is the proven suboptimality factor (1.0 is optimal),
+        stats["solutions"] lists (weight, cost, seconds, expanded) per improvement
+        and stats["complete"] is True when no budget cut the search short
+    """
+    start_time = perf_counter()
+    deadline = None if time_limit is None else start_time + time_limit
+    root = Node(start_state.board)
+    heuristic(root, goal_state.board)
+    lower_bound = root.h_score
+    best_path = None
+    best_cost = inf
+    bound = inf
+    expanded = 0
+    generated = 0
+    solutions = []
+    complete = True
+    for weight in weights:
+        remaining = None
+        if max_expansions is not None:
+            remaining = max_expansions - expanded
+            if remaining <= 0:
+                complete = False
+                break
+        result = a_star_search(
+            Node(start_state.board),
+            goal_state,
+            heuristic,
+            weight=weight,
+            upper_bound=best_cost,
+            max_expansions=remaining,
+            deadline=deadline,
+        )
+        expanded += result.expanded
+        generated += result.generated
+        if result.stats["budget_exhausted"]:
+            complete = False
+            break
+        if result.found:
+            best_path = result.path
+            best_cost = result.cost
+            bound = min(bound, weight)
+            solutions.append(
+                (weight, best_cost, perf_counter() - start_time, expanded)
+            )
+            if on_solution is not None:
+                on_solution(result)
+        else:
+            # nothing cheaper than the incumbent exists
+            bound = 1.0
+        if best_path is not None and lower_bound > 0:
+            bound = min(bound, best_cost / lower_bound)
+        if bound <= 1.0:
+            bound = 1.0
+            break
+    if best_path is None:
+        bound = None
+    return SearchResult(
+        best_path,
+        expanded,
+        generated,
+        {"bound": bound, "solutions": solutions, "complete": complete},
+    )
@@ -0,0 +1,200 @@
+"""
+Batch solver that runs many seeded random boards across a process pool.
+Results are streamed to a JSONL or CSV file as instances finish.
+
+Usage:
+    python batch_solve.py -n 10000 --seed 0 --solver a_star bnb --out results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import signal
+import sys
+import time
+from multiprocessing import Pool
+from setup_board import setup_board
+from solvers import PROCESS_SOLVERS, SOLVERS
+
+FIELDS = [
+    "index",
+    "seed",
+    "board_choice",
+    "solver",
+    "status",
+    "moves",
+    "runtime",
+    "expanded",
+    "generated",
+]
+
+
+class InstanceTimeout(Exception):
+    """
+    Raised inside a worker when an instance runs past its time limit
+    """
+
+
+def _raise_timeout(signum, frame):
+    raise InstanceTimeout()
+
+
+def make_instance(seed, index, board_choice=4):
+    """
+    Builds one reproducible instance
+    The same (seed, index) always gives the same board no matter which worker runs it
+    Arg1: seed of the whole batch                                       | #
+    Arg2: index of the instance in the batch                            | #
+    Arg3: setup_board() choice                                          | #
+
+    Return: start and goal nodes                                        | Node, Node
+    """
+    rng = random.Random(f"{seed}:{index}")
+    return setup_board(board_choice, compact=True, rng=rng)
+
+
+def solve_instance(task):
+    """
+    Solves one instance with every requested solver
+    Runs inside a pool worker
+    Arg1: (seed, index, board_choice, solver names, timeout in seconds or None) | tuple
+
+    Return: one result row per solver                                   | list[dict]
+    """
+    seed, index, board_choice, solver_names, timeout = task
+    rows = []
+    for name in solver_names:
+        # build fresh nodes per solver so no search state is shared
+        start_state, goal_state = make_instance(seed, index, board_choice)
+        row = {
+            "index": index,
+            "seed": seed,
+            "board_choice": board_choice,
+            "solver": name,
+            "status": None,
+            "moves": None,
+            "runtime": None,
+            "expanded": None,
+            "generated": None,
+        }
+        use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+        if use_alarm:
+            signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        start_time = time.perf_counter()
+        try:
+            result = SOLVERS[name](start_state, goal_state)
+            row["status"] = "solved" if result.found else "no_path"
+            row["moves"] = result.cost
+            row["expanded"] = result.expanded
+            row["generated"] = result.generated
+        except InstanceTimeout:
+            row["status"] = "timeout"
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        row["runtime"] = time.perf_counter() - start_time
+        rows.append(row)
+    return rows
+
+
+def batch_solve(
+    count,
+    seed=0,
+    solver_names=("a_star",),
+    board_choice=4,
+    workers=None,
+    chunksize=16,
+    timeout=None,
+):
+    """
+    Solves count seeded instances across a process pool
+    Rows come back in completion order, each row carries its instance index
+    Arg1: number of instances                                           | #
+    Arg2: seed of the whole batch                                       | #
+    Arg3: names of solvers from solvers.SOLVERS                         | [str]
+    Arg4: setup_board() choice                                          | #
+    Arg5: number of worker processes, None for every core               | #
+    Arg6: instances handed to a worker at a time                        | #
+    Arg7: per instance per solver time limit in seconds, None for none  | #
+        Needs SIGALRM, so the limit is not enforced on Windows
+
+    Return: generator of result rows                                    | dict
+    """
+    for name in solver_names:
+        if name not in SOLVERS:
+            raise ValueError(f"Unknown solver: {name}")
+        if name in PROCESS_SOLVERS:
+            raise ValueError(
+                f"{name} starts its own processes, it can't run in a batch"
+            )
+    tasks = (
+        (seed, index, board_choice, tuple(solver_names), timeout)
+        for index in range(count)
+    )
+    with Pool(processes=workers) as pool:
+        for rows in pool.imap_unordered(solve_instance, tasks, chunksize):
+            yield from rows
+
+
+def main():
+    """
+    Command line wrapper
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--solver",
+        nargs="+",
+        default=["a_star"],
+        choices=sorted(set(SOLVERS) - PROCESS_SOLVERS),
+    )
+    parser.add_argument("--board", type=int, default=4, help="setup_board() choice")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds")
+    parser.add_argument(
+        "--out", default=None, help=".jsonl or .csv file, stdout (JSONL) if omitted"
+    )
+    args = parser.parse_args()
+
+    out_file = sys.stdout if args.out is None else open(args.out, "w", newline="")
+    use_csv = args.out is not None and os.path.splitext(args.out)[1].lower() == ".csv"
+    writer = None
+    if use_csv:
+        writer = csv.DictWriter(out_file, fieldnames=FIELDS)
+        writer.writeheader()
+    start_time = time.perf_counter()
+    solved = 0
+    total = 0
+    try:
+        for row in batch_solve(
+            args.count,
+            args.seed,
+            args.solver,
+            args.board,
+            args.workers,
+            args.chunksize,
+            args.timeout,
+        ):
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                out_file.write(json.dumps(row) + "\n")
+            out_file.flush()
+            total += 1
+            solved += row["status"] == "solved"
+    finally:
+        if out_file is not sys.stdout:
+            out_file.close()
+    print(
+        f"{solved}/{total} solved in {time.perf_counter() - start_time:.2f} s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
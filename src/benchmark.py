@@ -0,0 +1,296 @@
+"""
+Benchmark harness comparing the solvers across board sizes.
+The solvers in solvers.DEFAULT_SOLVERS, or the ones named with --solver, are run on
+setup_board choices 1-3 and a seeded set of random 5x5 boards. Wall time is measured
+with perf_counter over several repeats, peak memory with tracemalloc in a separate
+run so tracing does not skew the timings.
+Results are saved as JSON and can be compared against a saved baseline.
+
+Usage:
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json --save latest.json
+    python benchmark.py --queues 100000 1000000
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from batch_solve import make_instance
+from bucket_queue import BucketQueue, HeapQueue
+from setup_board import setup_board
+from solvers import DEFAULT_SOLVERS, SOLVERS
+
+OPEN_LISTS = {
+    "heap": lambda: HeapQueue(tie_break_h=True),
+    "bucket": BucketQueue,
+    "bucket_fifo": lambda: BucketQueue(lifo=False),
+}
+
+
+def benchmark_cases(random_count=10, seed=0):
+    """
+    Names and builders of the benchmark boards
+    Arg1: number of seeded random 5x5 boards                            | #
+    Arg2: seed of the random boards                                     | #
+
+    Return: list of (case name, function returning start and goal)      | list[tuple]
+    """
+    cases = []
+    for choice in (1, 2, 3):
+        cases.append((f"board{choice}", lambda choice=choice: setup_board(choice, True)))
+    for index in range(random_count):
+        cases.append(
+            (
+                f"random{seed}:{index}",
+                lambda index=index: make_instance(seed, index),
+            )
+        )
+    return cases
+
+
+def run_case(solver, make_boards, repeats=5):
+    """
+    Times one solver on one board
+    Arg1: solver from solvers.SOLVERS                                   | Callable
+    Arg2: function returning fresh start and goal nodes                 | Callable
+    Arg3: number of timed runs                                          | #
+
+    Return: measurements                                                | dict
+    """
+    # untimed warm up so table builds and caches are not counted in the timings
+    solver(*make_boards())
+    times = []
+    result = None
+    for _ in range(repeats):
+        start_state, goal_state = make_boards()
+        start_time = time.perf_counter()
+        result = solver(start_state, goal_state)
+        times.append(time.perf_counter() - start_time)
+    start_state, goal_state = make_boards()
+    tracemalloc.start()
+    solver(start_state, goal_state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    median = statistics.median(times)
+    nodes_per_sec = None
+    if result.expanded is not None and median > 0:
+        nodes_per_sec = result.expanded / median
+    return {
+        "moves": result.cost,
+        "expanded": result.expanded,
+        "generated": result.generated,
+        "time_median": median,
+        "time_mean": statistics.mean(times),
+        "time_stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "time_min": min(times),
+        "peak_bytes": peak,
+        "nodes_per_sec": nodes_per_sec,
+    }
+
+
+def run_benchmarks(solver_names, cases, repeats=5, log=None):
+    """
+    Runs every solver on every case
+    Arg1: names of solvers from solvers.SOLVERS                         | [str]
+    Arg2: cases from benchmark_cases()                                  | list[tuple]
+    Arg3: number of timed runs per case                                 | #
+    Arg4: file to print progress to, None for quiet                     | file
+
+    Return: report with environment info and one row per solver/case    | dict
+    """
+    rows = []
+    for name in solver_names:
+        for case_name, make_boards in cases:
+            row = {"solver": name, "case": case_name}
+            row.update(run_case(SOLVERS[name], make_boards, repeats))
+            rows.append(row)
+            if log is not None:
+                print(
+                    f"{name:<14} {case_name:<12} moves={row['moves']} "
+                    f"expanded={row['expanded']} median={row['time_median']:.5f}s "
+                    f"peak={row['peak_bytes'] / 1024:.0f}KiB",
+                    file=log,
+                )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": repeats,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": rows,
+    }
+
+
+def queue_benchmark(frontier_sizes, churn=100_000, seed=0, log=None):
+    """
+    Times the open lists on an A* shaped workload
+    The frontier is filled to its size, then churn rounds each pop one entry
+    and push two children with f the same or 2 higher, the way a knight move
+    changes g + h. h counts down as f is spent so ties on f have spread out h.
+    Arg1: frontier sizes to fill the open list to                       | [#]
+    Arg2: pop and push rounds timed at each size                        | #
+    Arg3: seed of the workload                                          | #
+    Arg4: file to print progress to, None for quiet                     | file
+
+    Return: one row per open list and size                              | list[dict]
+    """
+    rows = []
+    for size in frontier_sizes:
+        rng = random.Random(seed)
+        fill = [(rng.randrange(20, 30), rng.randrange(0, 20)) for _ in range(size)]
+        steps = [rng.random() < 0.5 for _ in range(2 * churn)]
+        for name, make_open_list in OPEN_LISTS.items():
+            open_list = make_open_list()
+            start_time = time.perf_counter()
+            for item, (priority, h) in enumerate(fill):
+                open_list.push(priority, item, h)
+            fill_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            for i in range(churn):
+                priority, item = open_list.pop()
+                for grows in steps[2 * i : 2 * i + 2]:
+                    child_priority = priority + 2 if grows else priority
+                    open_list.push(child_priority, item, 1 if grows else 0)
+            churn_time = time.perf_counter() - start_time
+            row = {
+                "open_list": name,
+                "frontier": size,
+                "fill_seconds": fill_time,
+                "churn_seconds": churn_time,
+                "ops_per_sec": 3 * churn / churn_time if churn_time else None,
+            }
+            rows.append(row)
+            if log is not None:
+                print(
+                    f"{name:<12} frontier={size:<9} fill={fill_time:.3f}s "
+                    f"churn={churn_time:.3f}s ({row['ops_per_sec']:.0f} ops/s)",
+                    file=log,
+                )
+    return rows
+
+
+def compare_reports(baseline, current, tolerance=0.1):
+    """
+    Compares a report against a baseline report
+    A case is a regression when its median time grew by more than the tolerance
+    and by more than twice the larger of the two standard deviations (so noise
+    alone does not count), or when it now expands more nodes or finds a longer path.
+    Arg1: baseline report                                               | dict
+    Arg2: current report                                                | dict
+    Arg3: allowed relative slow down of the median time                 | #
+
+    Return: one comparison row per solver/case found in both reports    | list[dict]
+    """
+    old_rows = {(row["solver"], row["case"]): row for row in baseline["results"]}
+    comparisons = []
+    for row in current["results"]:
+        old = old_rows.get((row["solver"], row["case"]))
+        if old is None:
+            continue
+        ratio = row["time_median"] / old["time_median"] if old["time_median"] else 1.0
+        noise = 2 * max(row["time_stdev"], old["time_stdev"])
+        slower = (
+            ratio > 1 + tolerance
+            and row["time_median"] - old["time_median"] > noise
+        )
+        faster = (
+            ratio < 1 - tolerance
+            and old["time_median"] - row["time_median"] > noise
+        )
+        worse_search = (
+            old["expanded"] is not None
+            and row["expanded"] is not None
+            and row["expanded"] > old["expanded"]
+        ) or (
+            old["moves"] is not None
+            and row["moves"] is not None
+            and row["moves"] > old["moves"]
+        )
+        if slower or worse_search:
+            verdict = "regression"
+        elif faster:
+            verdict = "improvement"
+        else:
+            verdict = "same"
+        comparisons.append(
+            {
+                "solver": row["solver"],
+                "case": row["case"],
+                "time_ratio": ratio,
+                "expanded_before": old["expanded"],
+                "expanded_after": row["expanded"],
+                "verdict": verdict,
+            }
+        )
+    return comparisons
+
+
+def main():
+    """
+    Command line wrapper
+    Exits with status 1 when a baseline is given and a regression is found
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--solver",
+        nargs="+",
+        default=list(DEFAULT_SOLVERS),
+        choices=sorted(SOLVERS),
+    )
+    parser.add_argument("--random", type=int, default=10, help="random 5x5 boards")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", default=None, help="write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--queues",
+        nargs="+",
+        type=int,
+        default=None,
+        help="only compare the open lists, at these frontier sizes",
+    )
+    args = parser.parse_args()
+
+    if args.queues is not None:
+        rows = queue_benchmark(args.queues, seed=args.seed, log=sys.stderr)
+        if args.save is not None:
+            with open(args.save, "w") as report_file:
+                json.dump(rows, report_file, indent=2)
+        return
+
+    report = run_benchmarks(
+        args.solver,
+        benchmark_cases(args.random, args.seed),
+        args.repeats,
+        log=sys.stderr,
+    )
+    if args.save is not None:
+        with open(args.save, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        comparisons = compare_reports(baseline, report, args.tolerance)
+        for row in comparisons:
+            print(
+                f"{row['verdict']:<12} {row['solver']:<14} {row['case']:<12} "
+                f"time x{row['time_ratio']:.2f} "
+                f"expanded {row['expanded_before']} -> {row['expanded_after']}",
+                file=sys.stderr,
+            )
+        if any(row["verdict"] == "regression" for row in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
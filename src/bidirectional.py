@@ -0,0 +1,181 @@
+"""
+Bidirectional search that grows one frontier from the start and one from the
+goal and stops once they meet in the middle.
+Every move costs 1, so each side only needs to reach about half the solution
+depth and far fewer states are explored than searching from the start alone.
+"""
+
+from itertools import count
+from math import inf
+from node import Node
+from search_result import SearchResult
+import heapq
+
+
+def _join_path(forward_node: Node, backward_node: Node):
+    """
+    Joins the two halves of a bidirectional path
+    Arg1: meeting node reached from the start, parents lead to the start     | Node
+    Arg2: same state reached from the goal, parents lead to the goal         | Node
+
+    Return: nodes from start to goal with forward parent links                | list[Node]
+    """
+    path = []
+    node = forward_node
+    while node is not None:
+        path.append(node)
+        node = node.parent
+    path.reverse()
+    node = backward_node.parent
+    while node is not None:
+        path.append(Node(node.board, path[-1].g_score + 1, 0, path[-1]))
+        node = node.parent
+    return path
+
+
+def bidirectional_search(
+    start_state: Node,
+    goal_state: Node,
+    mode="front_to_front",
+    heuristic=Node.calc_heuristic,
+):
+    """
+    Bidirectional Search
+    Forward steps use Node.iter_children(), backward steps use Node.iter_predecessors()
+    Goal test covers the side to move like a_star_search()
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: termination strategy                                                | str
+        "front_to_front": breadth-first layers, the smaller frontier grows next
+            and the search stops after the layer in which the frontiers touch
+        "front_to_end": A* from both ends, each side estimating the distance to the
+            opposite end, stopping once no open node can beat the best meeting
+    Arg4: heuristic used by "front_to_end", same signature as Node.calc_heuristic
+
+    Return: path, cost and expanded/generated counts                          | SearchResult
+    """
+    if mode == "front_to_front":
+        return _front_to_front(start_state, goal_state)
+    if mode == "front_to_end":
+        return _front_to_end(start_state, goal_state, heuristic)
+    raise ValueError(f"Unknown bidirectional mode: {mode}")
+
+
+def _front_to_front(start_state: Node, goal_state: Node):
+    start_node = Node(start_state.board)
+    goal_node = Node(goal_state.board)
+    if start_node.board == goal_node.board:
+        return SearchResult([start_node], 0, 0, {"meeting_depth": 0})
+    # state key -> node for everything each side has reached
+    forward_seen = {start_node.board.state_key: start_node}
+    backward_seen = {goal_node.board.state_key: goal_node}
+    forward_layer = [start_node]
+    backward_layer = [goal_node]
+    expanded = 0
+    generated = 0
+    while forward_layer and backward_layer:
+        is_forward = len(forward_layer) <= len(backward_layer)
+        if is_forward:
+            layer, seen, other_seen = forward_layer, forward_seen, backward_seen
+        else:
+            layer, seen, other_seen = backward_layer, backward_seen, forward_seen
+        next_layer = []
+        best_cost = inf
+        meeting = None
+        for node in layer:
+            expanded += 1
+            if is_forward:
+                neighbours = node.iter_children()
+            else:
+                neighbours = node.iter_predecessors()
+            for child in neighbours:
+                generated += 1
+                key = child.board.state_key
+                if key in seen:
+                    continue
+                seen[key] = child
+                next_layer.append(child)
+                other = other_seen.get(key)
+                if other is not None and child.g_score + other.g_score < best_cost:
+                    best_cost = child.g_score + other.g_score
+                    meeting = (child, other) if is_forward else (other, child)
+        if meeting is not None:
+            # The whole layer was finished, so no shorter meeting is left
+            return SearchResult(
+                _join_path(*meeting),
+                expanded,
+                generated,
+                {"meeting_depth": meeting[0].g_score},
+            )
+        if is_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return SearchResult(None, expanded, generated)
+
+
+def _front_to_end(start_state: Node, goal_state: Node, heuristic):
+    start_node = Node(start_state.board)
+    goal_node = Node(goal_state.board)
+    start_board = start_node.board
+    goal_board = goal_node.board
+    tie_breaker = count()
+
+    def backward_heuristic(node):
+        # Estimate start -> node the way the moves are really played,
+        # the side to move at the start goes first
+        probe = Node(start_board)
+        heuristic(probe, node.board)
+        node.h_score = probe.h_score
+        node.f_score = node.g_score + node.h_score
+
+    heuristic(start_node, goal_board)
+    backward_heuristic(goal_node)
+    forward_heap = [(start_node.f_score, start_node.h_score, next(tie_breaker), start_node)]
+    backward_heap = [(goal_node.f_score, goal_node.h_score, next(tie_breaker), goal_node)]
+    # state key -> cheapest node found so far on each side
+    forward_best = {start_board.state_key: start_node}
+    backward_best = {goal_board.state_key: goal_node}
+    best_cost = 0 if start_board == goal_board else inf
+    meeting = (start_node, goal_node) if best_cost == 0 else None
+    expanded = 0
+    generated = 0
+    while forward_heap and backward_heap:
+        # Every unfound path crosses an open node on both sides,
+        # so it costs at least the larger of the two smallest f scores
+        if max(forward_heap[0][0], backward_heap[0][0]) >= best_cost:
+            break
+        is_forward = len(forward_heap) <= len(backward_heap)
+        if is_forward:
+            heap, best, other_best = forward_heap, forward_best, backward_best
+        else:
+            heap, best, other_best = backward_heap, backward_best, forward_best
+        _, _, _, node = heapq.heappop(heap)
+        if best[node.board.state_key] is not node:
+            continue  # stale entry, a cheaper copy was pushed later
+        expanded += 1
+        if is_forward:
+            neighbours = node.iter_children()
+        else:
+            neighbours = node.iter_predecessors()
+        for child in neighbours:
+            generated += 1
+            key = child.board.state_key
+            known = best.get(key)
+            if known is not None and known.g_score <= child.g_score:
+                continue
+            best[key] = child
+            other = other_best.get(key)
+            if other is not None and child.g_score + other.g_score < best_cost:
+                best_cost = child.g_score + other.g_score
+                meeting = (child, other) if is_forward else (other, child)
+            if is_forward:
+                heuristic(child, goal_board)
+            else:
+                backward_heuristic(child)
+            heapq.heappush(heap, (child.f_score, child.h_score, next(tie_breaker), child))
+    if meeting is None:
+        return SearchResult(None, expanded, generated)
+    return SearchResult(
+        _join_path(*meeting), expanded, generated, {"meeting_depth": meeting[0].g_score}
+    )
@@ -0,0 +1,228 @@
+"""
+Compact chess board that stores each color's knights as an integer bitmask.
+Knight destinations come from a table built once per board size and moves
+return a new board instead of mutating, so making a child costs O(1).
+"""
+
+from chess_board import turn_key_bit
+from knight_moves import knight_move_table
+
+
+class BitBoard:
+    """
+    Immutable board state backed by one bitmask per color.
+    Bit (row * cols + col) is set when a knight of that color is on the square.
+    The knight position tuples keep the same ordering as ChessBoard's lists.
+    Attributes:
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+        white_mask (int): Squares occupied by white knights
+        black_mask (int): Squares occupied by black knights
+        current_turn (char): W or B for whoever moves next
+        white_knight_pos_list (tuple): Positions of the white knights
+        black_knight_pos_list (tuple): Positions of the black knights
+        state_key (int): Packed masks and side to move, same layout as ChessBoard
+    Methods:
+        from_chess_board(board)
+        from_state_key(rows, cols, state_key)
+        get_piece(pos)
+        valid_moves(knight_pos)
+        make_move(pos, dest)
+        same_pieces(other)
+        print_board()
+    """
+
+    __slots__ = (
+        "rows",
+        "cols",
+        "white_mask",
+        "black_mask",
+        "current_turn",
+        "white_knight_pos_list",
+        "black_knight_pos_list",
+        "state_key",
+        "_moves",
+    )
+
+    def __init__(
+        self,
+        rows,
+        cols,
+        white_knight_pos_list,
+        black_knight_pos_list,
+        current_turn="W",
+        white_mask=None,
+        black_mask=None,
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.current_turn = current_turn
+        # Masks are only passed in by make_move(), which already hands over tuples
+        if white_mask is None or black_mask is None:
+            white_knight_pos_list = tuple(tuple(pos) for pos in white_knight_pos_list)
+            black_knight_pos_list = tuple(tuple(pos) for pos in black_knight_pos_list)
+            white_mask = 0
+            for row, col in white_knight_pos_list:
+                white_mask |= 1 << (row * cols + col)
+            black_mask = 0
+            for row, col in black_knight_pos_list:
+                black_mask |= 1 << (row * cols + col)
+        self.white_knight_pos_list = white_knight_pos_list
+        self.black_knight_pos_list = black_knight_pos_list
+        self.white_mask = white_mask
+        self.black_mask = black_mask
+        squares = rows * cols
+        self.state_key = (
+            white_mask | (black_mask << squares) | turn_key_bit(current_turn, squares)
+        )
+        self._moves = knight_move_table(rows, cols)
+
+    @classmethod
+    def from_chess_board(cls, board):
+        """
+        Builds a compact copy of a list based ChessBoard
+        Arg1: board to convert                                          | ChessBoard
+
+        Return: equivalent compact board                                | BitBoard
+        """
+        return cls(
+            board.rows,
+            board.cols,
+            board.white_knight_pos_list,
+            board.black_knight_pos_list,
+            board.current_turn,
+        )
+
+    @classmethod
+    def from_state_key(cls, rows, cols, state_key):
+        """
+        Rebuilds a board from its packed state key
+        Knights are listed in square order
+        Arg1: number of rows on the board                               | #
+        Arg2: number of columns on the board                            | #
+        Arg3: packed state key                                          | #
+
+        Return: board with that key                                     | BitBoard
+        """
+        squares = rows * cols
+        square_bits = (1 << squares) - 1
+        white_mask = state_key & square_bits
+        black_mask = (state_key >> squares) & square_bits
+        pos_lists = []
+        for mask in (white_mask, black_mask):
+            pos_list = []
+            while mask:
+                low = mask & -mask
+                pos_list.append(divmod(low.bit_length() - 1, cols))
+                mask ^= low
+            pos_lists.append(tuple(pos_list))
+        white_pos, black_pos = pos_lists
+        current_turn = "B" if state_key >> (2 * squares) else "W"
+        return cls(rows, cols, white_pos, black_pos, current_turn, white_mask, black_mask)
+
+    def __hash__(self) -> int:
+        return self.state_key
+
+    def __eq__(self, other):
+        """
+        Method to compare board states
+        Compares both piece placement and who's turn it is
+
+        Return: if two boards are the same                              | Bool
+        """
+        return self.state_key == other.state_key
+
+    @property
+    def board_state(self):
+        """
+        List of lists view of the board, built on demand for printing
+
+        Return: rows of one character strings                           | [[char]]
+        """
+        board_state = [["."] * self.cols for _ in range(self.rows)]
+        for row, col in self.white_knight_pos_list:
+            board_state[row][col] = "W"
+        for row, col in self.black_knight_pos_list:
+            board_state[row][col] = "B"
+        return board_state
+
+    def get_piece(self, pos):
+        """
+        Method to return what piece is at a given position
+        Arg1: coordinate position to look for a piece                   | [#,#]
+
+        Return: piece found                                             | char
+        """
+        bit = 1 << (pos[0] * self.cols + pos[1])
+        if self.white_mask & bit:
+            return "W"
+        if self.black_mask & bit:
+            return "B"
+        return "."
+
+    def valid_moves(self, knight_pos):
+        """
+        Finds the empty squares a SINGLE knight can jump to
+        Arg1: coordinate position of a knight                           | [#,#]
+
+        Return: list of valid destination coordinate positions          | [(#,#),...]
+        """
+        occupied = self.white_mask | self.black_mask
+        return [
+            dest
+            for bit, dest in self._moves[knight_pos[0] * self.cols + knight_pos[1]]
+            if not occupied & bit
+        ]
+
+    def make_move(self, pos, dest):
+        """
+        Makes the board reached by moving a piece and passing the turn
+        The current board is left untouched
+        Arg1: coordinate position of the piece being moved              | [#,#]
+        Arg2: coordinate position of the piece after it is moved        | [#,#]
+
+        Return: new board with the piece moved and the turn flipped     | BitBoard
+        """
+        pos = tuple(pos)
+        dest = tuple(dest)
+        pos_bit = 1 << (pos[0] * self.cols + pos[1])
+        move_bits = pos_bit | (1 << (dest[0] * self.cols + dest[1]))
+        next_turn = "B" if self.current_turn == "W" else "W"
+        white_pos = self.white_knight_pos_list
+        black_pos = self.black_knight_pos_list
+        white_mask = self.white_mask
+        black_mask = self.black_mask
+        if white_mask & pos_bit:
+            white_pos = tuple(dest if knight == pos else knight for knight in white_pos)
+            white_mask ^= move_bits
+        else:
+            black_pos = tuple(dest if knight == pos else knight for knight in black_pos)
+            black_mask ^= move_bits
+        return BitBoard(
+            self.rows,
+            self.cols,
+            white_pos,
+            black_pos,
+            next_turn,
+            white_mask,
+            black_mask,
+        )
+
+    def same_pieces(self, other):
+        """
+        Compares piece placement only, ignoring who's turn it is
+
+        Return: if both boards have the same knights on the same squares | Bool
+        """
+        piece_bits = (1 << (2 * self.rows * self.cols)) - 1
+        return not (self.state_key ^ other.state_key) & piece_bits
+
+    def print_board(self):
+        """
+        Method to print out the board
+
+        Return: Nothing
+        """
+        for row in self.board_state:
+            print(" ".join(row))
+        print(f"{'_' * (self.cols*2 - 1)}")
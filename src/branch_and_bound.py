@@ -5,32 +5,69 @@ This Branch and Bound is an exact Branch and Bound not a greedy Branch and Bound
 Author: Nicholas Butzke
 """
 
+from math import inf
+from a_star import a_star_search
+from bucket_queue import HeapQueue
+from feasibility import infeasibility_reason
+from instrumentation import timed_children, timed_heuristic
 from node import Node
-import heapq
+from search_result import SearchResult
 
 
-def bnb(start_state: Node, goal_state: Node):
+def bnb(
+    start_state: Node,
+    goal_state: Node,
+    observer=None,
+    state_key=None,
+    closed_set=None,
+    open_list=None,
+    precheck=True,
+):
     """
     Branch and Bound Algorithm
     Finds the shortest path from a source to a destination using traditional methods
     Arg1: destination node                                                           |    Node
+    Arg2: optional instrumentation.SearchObserver, None disables it                  |    SearchObserver
+    Arg3: function mapping a board to its duplicate detection key, such as
+        symmetry.SymmetryKey(goal, match_turn=False). None uses board.state_key      |    Callable
+    Arg4: container for the closed state keys, such as a
+        disk_closed_set.DiskClosedSet to cap memory. None uses a set()               |    set[int]
+    Arg5: empty open list with push/pop, such as a bucket_queue.BucketQueue.
+        None uses a HeapQueue of (g_score, node)                                     |    HeapQueue
+    Arg6: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                              |    Bool
 
     Return: Optimal path if one is found. Otherwise will report no path found        |    list[Node]
     """
-    open_heap: heapq = []
-    heapq.heappush(open_heap, (0, start_state))
-    open_set: set[Node] = set()
-    open_set.add(start_state)
-    closed_set: set[Node] = set()
+    if state_key is None:
+
+        def state_key(board):
+            return board.state_key
+
+    if precheck and infeasibility_reason(
+        start_state.board, goal_state.board, match_turn=False
+    ):
+        return "no path found"
+    if open_list is None:
+        open_list = HeapQueue()
+    open_list.push(0, start_state)
+    # state keys of the open and closed nodes
+    open_set: set[int] = set()
+    open_set.add(state_key(start_state.board))
+    if closed_set is None:
+        closed_set = set()
 
     shortest_path = []
     shortest_path_length = float("inf")  # this is the bound
     while open_set:
         current_node: Node
-        _, current_node = heapq.heappop(open_heap)
-        open_set.remove(current_node)
+        _, current_node = open_list.pop()
+        current_key = state_key(current_node.board)
+        open_set.remove(current_key)
         # Report if the front of the queue is the goal
-        if current_node.board.board_state == goal_state.board.board_state:
+        if current_node.board.same_pieces(goal_state.board):
+            if observer is not None:
+                observer.on_goal(current_node)
             path = []
             while current_node is not None:
                 path.append(current_node)
@@ -40,14 +77,172 @@ def bnb(start_state: Node, goal_state: Node):
             shortest_path = path[::-1]
         else:  # Didn't find the goal
             if current_node.g_score + 1 < shortest_path_length:
-                current_node.make_children()  # Generate its children nodes
-                for child in current_node.children:
-                    if not (child in open_set and child.g_score < shortest_path_length):
+                # Stream its children nodes
+                if observer is None:
+                    children = current_node.iter_children()
+                else:
+                    observer.on_expand(current_node, len(open_list), len(closed_set))
+                    children = timed_children(current_node, observer)
+                for child in children:
+                    child_key = state_key(child.board)
+                    if not (
+                        child_key in open_set and child.g_score < shortest_path_length
+                    ):
                         # Look if an equivilant to the child node has already been checked
-                        if child not in closed_set:
-                            heapq.heappush(open_heap, (child.g_score, child))
-                            open_set.add(child)
-        closed_set.add(current_node)
+                        if child_key not in closed_set:
+                            open_list.push(child.g_score, child)
+                            open_set.add(child_key)
+                        elif observer is not None:
+                            observer.on_prune(child, "closed")
+                    elif observer is not None:
+                        observer.on_prune(child, "open")
+            elif observer is not None:
+                observer.on_prune(current_node, "bound")
+        closed_set.add(current_key)
     if shortest_path:
         return shortest_path
     return "no path found"
+
+
+def bnb_bounded(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=Node.calc_heuristic,
+    seed_weight=3,
+    incumbent=None,
+    observer=None,
+    state_key=None,
+    seed_max_expansions=10000,
+    precheck=True,
+    closed_set=None,
+):
+    """
+    Bounded Branch and Bound Algorithm
+    Depth-first, trying the children with the lowest f score first. A branch is cut
+    as soon as g + h reaches the cost of the best path found so far (the incumbent),
+    and a state is only searched again when it is reached with a lower g.
+    The incumbent is seeded with a fast weighted A* path so cutting starts right away.
+    The seeding run is capped, if it runs out the search starts with no bound.
+    Goal test covers the side to move like a_star_search()
+    Arg1: start node                                                                 |    Node
+    Arg2: destination node                                                           |    Node
+    Arg3: admissible heuristic with the Node.calc_heuristic signature                 |    Callable
+    Arg4: weight of the seeding A*, None or 0 to skip seeding                        |    #
+    Arg5: known path to start from instead of seeding                                |    list[Node]
+    Arg6: optional instrumentation.SearchObserver, None disables it                  |    SearchObserver
+    Arg7: function mapping a board to its duplicate detection key, such as
+        symmetry.SymmetryKey(goal). None uses board.state_key                        |    Callable
+    Arg8: expansions the seeding A* may make, None for no limit                      |    #
+    Arg9: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                              |    Bool
+    Arg10: empty mapping for the best g per state key, such as a
+        disk_closed_set.DiskScoreMap to cap memory. None uses a dict()               |    dict[int, int]
+
+    Return: optimal path, cost and expanded/generated counts                         |    SearchResult
+        stats["infeasible"] holds the reason when the precheck ruled it out
+    """
+    if state_key is None:
+
+        def state_key(board):
+            return board.state_key
+
+    goal_board = goal_state.board
+    reason = infeasibility_reason(start_state.board, goal_board) if precheck else None
+    if reason is not None:
+        return SearchResult(
+            None,
+            0,
+            0,
+            {
+                "seed_cost": None,
+                "improvements": 0,
+                "seed_expanded": 0,
+                "infeasible": reason,
+            },
+        )
+    start_node = Node(start_state.board)
+    seed_expanded = 0
+    seed_generated = 0
+    seed_exhausted = False
+    if incumbent is None and seed_weight:
+        seed = a_star_search(
+            start_node,
+            goal_state,
+            heuristic,
+            weight=seed_weight,
+            max_expansions=seed_max_expansions,
+            state_key=state_key,
+            precheck=False,
+        )
+        incumbent = seed.path
+        seed_expanded = seed.expanded
+        seed_generated = seed.generated
+        # a finished seeding run that found nothing has searched every reachable state
+        seed_exhausted = incumbent is None and not seed.stats["budget_exhausted"]
+        start_node = Node(start_state.board)
+    best_path = incumbent
+    bound = inf if incumbent is None else len(incumbent) - 1
+    stats = {"seed_cost": None if incumbent is None else bound, "improvements": 0}
+    if seed_exhausted:
+        stats["seed_expanded"] = seed_expanded
+        return SearchResult(None, seed_expanded, seed_generated, stats)
+    if start_node.board == goal_board:
+        return SearchResult([start_node], seed_expanded, seed_generated, stats)
+    heuristic(start_node, goal_board)
+    best_g: dict[int, int] = {} if closed_set is None else closed_set
+    best_g[state_key(start_node.board)] = 0
+    expanded = 0
+    generated = 0
+
+    def ordered_children(node):
+        # score every child up front so the most promising one is tried first
+        if observer is None:
+            children = list(node.iter_children())
+            for child in children:
+                heuristic(child, goal_board)
+        else:
+            children = list(timed_children(node, observer))
+            for child in children:
+                timed_heuristic(heuristic, child, goal_board, observer)
+        children.sort(key=lambda child: (child.f_score, child.h_score))
+        return iter(children)
+
+    stack = [ordered_children(start_node)]
+    expanded += 1
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        generated += 1
+        if child.f_score >= bound:
+            if observer is not None:
+                observer.on_prune(child, "bound")
+            continue
+        key = state_key(child.board)
+        if child.g_score >= best_g.get(key, inf):
+            if observer is not None:
+                observer.on_prune(child, "duplicate")
+            continue
+        best_g[key] = child.g_score
+        if child.board == goal_board:
+            if observer is not None:
+                observer.on_goal(child)
+            bound = child.g_score
+            stats["improvements"] += 1
+            best_path = []
+            node = child
+            while node is not None:
+                best_path.append(node)
+                node = node.parent
+            best_path.reverse()
+            continue
+        expanded += 1
+        if observer is not None:
+            observer.on_expand(child, len(stack), len(best_g))
+        stack.append(ordered_children(child))
+    stats["seed_expanded"] = seed_expanded
+    # report the seeding work too so the counts compare fairly with other solvers
+    return SearchResult(
+        best_path, expanded + seed_expanded, generated + seed_generated, stats
+    )
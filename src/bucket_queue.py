@@ -0,0 +1,178 @@
+"""
+Open lists for the searches.
+HeapQueue is the binary heap the solvers have always used. BucketQueue is for
+small non-negative integer priorities, which is what f = g + h is when every move
+costs 1 and h is an integer. It keeps one bucket per priority and a pointer to the
+lowest bucket that may be non-empty, so push and pop take O(1) steps plus the
+pointer's walk, and no Python-level comparisons are made between entries.
+Both share push(priority, item, h) / pop() / len() so a solver takes either one.
+"""
+
+from collections import deque
+from itertools import count
+from math import inf
+import heapq
+
+
+class HeapQueue:
+    """
+    Binary heap open list
+    Arg1: break priority ties by lower h, then insertion order. Without it
+        entries are (priority, item) tuples and ties fall back to the items  | Bool
+    Methods:
+        push(priority, item, h)
+        pop()
+    """
+
+    __slots__ = ("heap", "tie_break_h", "_counter")
+
+    def __init__(self, tie_break_h=False):
+        self.heap: list = []
+        self.tie_break_h = tie_break_h
+        self._counter = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, priority, item, h=0):
+        if self.tie_break_h:
+            heapq.heappush(self.heap, (priority, h, next(self._counter), item))
+        else:
+            heapq.heappush(self.heap, (priority, item))
+
+    def pop(self):
+        """
+        Removes the entry with the lowest priority
+
+        Return: priority and item                                       | #, object
+        """
+        entry = heapq.heappop(self.heap)
+        return entry[0], entry[-1]
+
+
+def _bucket_index(value, name):
+    """
+    Checks that a priority or h can index a bucket
+    """
+    index = int(value)
+    if index != value or index < 0:
+        raise ValueError(
+            f"BucketQueue needs non-negative integer {name}s, got {value}"
+        )
+    return index
+
+
+class _HBucket:
+    """
+    One priority's entries, split again into sub-buckets per h
+    """
+
+    __slots__ = ("size", "low", "by_h")
+
+    def __init__(self):
+        self.size = 0
+        self.low = 0
+        self.by_h: list = []
+
+
+class BucketQueue:
+    """
+    Array of per-priority buckets with a moving minimum pointer
+    An infinite priority (unreachable goal) goes to an overflow bucket popped last
+    Arg1: pop the newest entry of a bucket first (LIFO) instead of the oldest (FIFO).
+        LIFO dives towards the goal among equal f                        | Bool
+    Arg2: inside a priority pop lower h first, through a second level of
+        buckets per h                                                   | Bool
+    Methods:
+        push(priority, item, h)
+        pop()
+    """
+
+    __slots__ = ("lifo", "tie_break_h", "_buckets", "_min", "_size", "_overflow")
+
+    def __init__(self, lifo=True, tie_break_h=True):
+        self.lifo = lifo
+        self.tie_break_h = tie_break_h
+        self._buckets: list = []
+        self._min = 0
+        self._size = 0
+        self._overflow = deque()
+
+    def __len__(self):
+        return self._size
+
+    def _new_bucket(self):
+        if self.tie_break_h:
+            return _HBucket()
+        return [] if self.lifo else deque()
+
+    def push(self, priority, item, h=0):
+        """
+        Adds an item
+        Arg1: non-negative integer priority or inf                      | #
+        Arg2: item to store                                             | object
+        Arg3: non-negative integer tie breaker, used with tie_break_h   | #
+
+        Return: Nothing
+        """
+        if type(priority) is not int or priority < 0:
+            if priority == inf:
+                self._size += 1
+                self._overflow.append(item)
+                return
+            priority = _bucket_index(priority, "priority")
+        self._size += 1
+        buckets = self._buckets
+        if len(buckets) <= priority:
+            missing = priority + 1 - len(buckets)
+            buckets.extend(self._new_bucket() for _ in range(missing))
+        if priority < self._min:
+            self._min = priority
+        bucket = buckets[priority]
+        if not self.tie_break_h:
+            bucket.append(item)
+            return
+        if type(h) is not int or h < 0:
+            h = _bucket_index(h, "h")
+        by_h = bucket.by_h
+        if len(by_h) <= h:
+            missing = h + 1 - len(by_h)
+            by_h.extend([] if self.lifo else deque() for _ in range(missing))
+        by_h[h].append(item)
+        if bucket.size == 0 or h < bucket.low:
+            bucket.low = h
+        bucket.size += 1
+
+    def pop(self):
+        """
+        Removes an entry with the lowest priority
+
+        Return: priority and item                                       | #, object
+        """
+        if not self._size:
+            raise IndexError("pop from an empty BucketQueue")
+        self._size -= 1
+        buckets = self._buckets
+        priority = self._min
+        last = len(buckets)
+        if self.tie_break_h:
+            while priority < last and not buckets[priority].size:
+                priority += 1
+        else:
+            while priority < last and not buckets[priority]:
+                priority += 1
+        self._min = priority
+        if priority == last:
+            return inf, self._overflow.popleft()
+        bucket = buckets[priority]
+        if self.tie_break_h:
+            bucket.size -= 1
+            by_h = bucket.by_h
+            h = bucket.low
+            while not by_h[h]:
+                h += 1
+            bucket.low = h
+            bucket = by_h[h]
+        if self.lifo:
+            return priority, bucket.pop()
+        return priority, bucket.popleft()
@@ -4,12 +4,47 @@ Chess board class that defaults to a 3x3 board
 Author: Nicholas Butzke
 """
 
-from itertools import chain
+from copy import deepcopy
+from knight_moves import knight_move_table
+
+
+def piece_key_bit(piece, square, squares):
+    """
+    Bit a piece contributes to a packed state key
+    Keys hold white squares in bits [0, n), black squares in bits [n, 2n)
+    and bit 2n is set when it is black's turn
+    Arg1: piece on the square                                        | char
+    Arg2: square index (row * columns + column)                      | #
+    Arg3: number of squares on the board                             | #
+
+    Return: the key bit for that piece, 0 for an empty square        | #
+    """
+    if piece == "W":
+        return 1 << square
+    if piece == "B":
+        return 1 << (squares + square)
+    return 0
+
+
+def turn_key_bit(turn, squares):
+    """
+    Bit the side to move contributes to a packed state key
+    Arg1: whoever moves next                                         | char
+    Arg2: number of squares on the board                             | #
+
+    Return: the key bit for that turn                                | #
+    """
+    if turn == "B":
+        return 1 << (2 * squares)
+    return 0
 
 
 class ChessBoard:
     """
     Board state or node object.
+    state_key packs piece placement and the side to move into one int.
+    It is kept up to date by set_piece() and the current_turn setter
+    so hashing and comparing boards never walks board_state.
     """
 
     def __init__(
@@ -18,25 +53,61 @@ class ChessBoard:
         current_turn="W",
         white_kight_pos_list=None,
         black_knight_pos_list=None,
+        state_key=None,
     ):
         if board_state is None:
             board_state = [["B", ".", "B"], [".", ".", "."], ["W", ".", "W"]]
         self.board_state = board_state
-        self.current_turn = current_turn  # white is W and black is B
+        self.rows = len(board_state)
+        self.cols = len(board_state[0])
+        if state_key is None:
+            squares = self.rows * self.cols
+            state_key = turn_key_bit(current_turn, squares)
+            for row, pieces in enumerate(board_state):
+                for col, piece in enumerate(pieces):
+                    state_key |= piece_key_bit(piece, row * self.cols + col, squares)
+        self.state_key = state_key
+        self._current_turn = current_turn  # white is W and black is B
 
         # Stores a list of knights and their positions.
         # Prevents searching for each knight on the board when calculating heuristic
+        # Lists that are not passed in are read off the board in row order
         if white_kight_pos_list is None:
-            white_kight_pos_list = [[2, 0], [2, 2]]
+            white_kight_pos_list = self.find_pieces("W")
         if black_knight_pos_list is None:
-            black_knight_pos_list = [[0, 0], [0, 2]]
+            black_knight_pos_list = self.find_pieces("B")
         self.white_knight_pos_list = white_kight_pos_list
         self.black_knight_pos_list = black_knight_pos_list
+        self._moves = knight_move_table(self.rows, self.cols)
 
     def __hash__(self) -> int:
-        flattened_list = list(chain.from_iterable(self.board_state))
-        converted_tuple = tuple(flattened_list)
-        return hash(converted_tuple)
+        return self.state_key
+
+    @property
+    def current_turn(self):
+        return self._current_turn
+
+    @current_turn.setter
+    def current_turn(self, turn):
+        squares = self.rows * self.cols
+        self.state_key ^= turn_key_bit(self._current_turn, squares) ^ turn_key_bit(
+            turn, squares
+        )
+        self._current_turn = turn
+
+    def find_pieces(self, piece):
+        """
+        Method to find every square holding a given piece
+        Arg1: piece to look for                                         |           char
+
+        Return: coordinate positions in row order                       |           [[#,#]]
+        """
+        return [
+            [row, col]
+            for row, pieces in enumerate(self.board_state)
+            for col, square in enumerate(pieces)
+            if square == piece
+        ]
 
     def get_piece(self, pos):
         """
@@ -57,6 +128,11 @@ class ChessBoard:
 
         Return: Nothing
         """
+        square = pos[0] * self.cols + pos[1]
+        squares = self.rows * self.cols
+        self.state_key ^= piece_key_bit(
+            self.board_state[pos[0]][pos[1]], square, squares
+        ) ^ piece_key_bit(piece, square, squares)
         self.board_state[pos[0]][pos[1]] = piece
 
     def change_pos_record(self, piece, pos, dest):
@@ -75,15 +151,13 @@ class ChessBoard:
         Designed this early and just built it in.
         """
         if piece == "B":
-            if self.black_knight_pos_list[0] == pos:
-                self.black_knight_pos_list[0] = dest
-            else:
-                self.black_knight_pos_list[1] = dest
-        if piece == "W":
-            if self.white_knight_pos_list[0] == pos:
-                self.white_knight_pos_list[0] = dest
-            else:
-                self.white_knight_pos_list[1] = dest
+            pos_list = self.black_knight_pos_list
+        else:
+            pos_list = self.white_knight_pos_list
+        for i, knight_pos in enumerate(pos_list):
+            if knight_pos[0] == pos[0] and knight_pos[1] == pos[1]:
+                pos_list[i] = dest
+                return
 
     def move_piece(self, piece_pos, piece_dest):
         """
@@ -98,6 +172,55 @@ class ChessBoard:
         self.set_piece(piece_dest, piece)
         self.set_piece(piece_pos, ".")
 
+    def valid_moves(self, knight_pos):
+        """
+        Finds the empty squares a SINGLE knight can jump to
+        Arg1: coordinate position of a knight                  | [#,#]
+
+        Return: list of valid destination coordinate positions | [[#,#],[#,#],...[#,#]]
+        """
+        board_state = self.board_state
+        return [
+            dest
+            for _, dest in self._moves[knight_pos[0] * self.cols + knight_pos[1]]
+            if board_state[dest[0]][dest[1]] == "."
+        ]
+
+    def make_move(self, piece_pos, piece_dest):
+        """
+        Makes a copy of the board with a piece moved and the turn passed
+        The current board is left untouched
+        Arg1: coordinate position of the piece that needs to be moved          |        [#,#]
+        Arg2: coordinate position of the piece after it is moved               |        [#,#]
+
+        Return: new board with the piece moved and the turn flipped            |   ChessBoard
+        """
+        if self.current_turn == "W":
+            next_turn = "B"
+        else:
+            next_turn = "W"
+        squares = self.rows * self.cols
+        child_board = ChessBoard(
+            deepcopy(self.board_state),
+            next_turn,
+            deepcopy(self.white_knight_pos_list),
+            deepcopy(self.black_knight_pos_list),
+            self.state_key
+            ^ turn_key_bit(self.current_turn, squares)
+            ^ turn_key_bit(next_turn, squares),
+        )
+        child_board.move_piece(piece_pos, piece_dest)
+        return child_board
+
+    def same_pieces(self, other):
+        """
+        Method to compare piece placement only, ignoring who's turn it is
+
+        Return: if both boards have the same knights on the same squares            |           Bool
+        """
+        piece_bits = (1 << (2 * self.rows * self.cols)) - 1
+        return not (self.state_key ^ other.state_key) & piece_bits
+
     def print_board(self):
         """
         Method to print out the board
@@ -108,7 +231,7 @@ class ChessBoard:
         """
         for row in self.board_state:
             print(" ".join(row))
-        print(f"{'_' * (len(self.board_state)*2 - 1)}")
+        print(f"{'_' * (self.cols*2 - 1)}")
 
     def __eq__(self, other):
         """
@@ -118,7 +241,4 @@ class ChessBoard:
 
         Return: if two boards are the same                                          |           Bool
         """
-        return (
-            self.board_state == other.board_state
-            and self.current_turn == other.current_turn
-        )
+        return self.state_key == other.state_key
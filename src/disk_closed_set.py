@@ -0,0 +1,389 @@
+"""
+Closed set that spills to disk once it outgrows a memory cap.
+New state keys go to an in-memory hot set. When the hot set reaches its cap it is
+sorted and written out as a run of fixed-width big-endian keys, which sort the
+same as the numbers they hold, and the run is memory-mapped for lookups.
+Each run has a Bloom filter in front so most misses never touch the file, and a
+lookup that gets past the filter is a binary search over the mapped run.
+Runs are merged into one when there are too many of them.
+
+DiskScoreMap is the same store holding a best g per key, for the searches that
+reopen a state when it is reached more cheaply. A key set again after a spill is
+written to a newer run, so lookups go from the newest run back.
+"""
+
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+import weakref
+
+_MIX_1 = 0x9E3779B97F4A7C15
+_MIX_2 = 0xC2B2AE3D27D4EB4F
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Bit array answering "maybe present" or "certainly absent"
+    Probes come from two mixes of hash(key) (double hashing)
+    Attributes:
+        size (int): Number of bits
+        probes (int): Bits set per key
+    Methods:
+        add(key)
+        __contains__(key)
+    """
+
+    def __init__(self, capacity, bits_per_key=10):
+        self.size = max(64, capacity * bits_per_key)
+        self.probes = max(1, round(bits_per_key * 0.69))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        hashed = hash(key)
+        first = (hashed * _MIX_1) & _MASK64
+        step = ((hashed * _MIX_2) & _MASK64) | 1
+        for i in range(self.probes):
+            yield ((first + i * step) & _MASK64) % self.size
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        for position in self._positions(key):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class _SortedRun:
+    """
+    One memory-mapped file of sorted fixed-width records and its Bloom filter
+    A record is an encoded key, followed by an encoded value in a DiskScoreMap
+    """
+
+    def __init__(self, path, width, count, bloom, key_width=None):
+        self.path = path
+        self.width = width
+        self.key_width = width if key_width is None else key_width
+        self.count = count
+        self.bloom = bloom
+        with open(path, "rb") as run_file:
+            self.data = mmap.mmap(run_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def find(self, encoded):
+        """
+        Binary search for an encoded key
+        Arg1: key as key_width big-endian bytes                         | bytes
+
+        Return: the record holding the key, None if it isn't in the run | bytes
+        """
+        width = self.width
+        key_width = self.key_width
+        data = self.data
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * width
+            entry = data[start : start + key_width]
+            if entry < encoded:
+                low = middle + 1
+            elif entry > encoded:
+                high = middle
+            else:
+                return data[start : start + width]
+        return None
+
+    def __contains__(self, encoded):
+        return self.find(encoded) is not None
+
+    def __iter__(self):
+        width = self.width
+        for start in range(0, self.count * width, width):
+            yield self.data[start : start + width]
+
+    def close(self):
+        self.data.close()
+        os.remove(self.path)
+
+
+class DiskClosedSet:
+    """
+    Set of state keys with a capped in-memory part and sorted runs on disk
+    Supports the add/in/len use the solvers make of a closed set, so it can be
+    passed to a_star() or bnb() as closed_set
+    Arg1: bits in a state key, 2 * rows * cols + 1 for the packed keys      | #
+    Arg2: keys held in memory before spilling a run                        | #
+    Arg3: directory for the runs, None for a temporary one                 | str
+    Arg4: Bloom filter bits per key, more means fewer wasted disk lookups   | #
+    Arg5: runs allowed before they are merged into one                     | #
+    Attributes:
+        spills (int): Runs written so far
+        disk_lookups (int): Lookups that reached a run past its Bloom filter
+        bloom_false_positives (int): Of those, lookups that found nothing
+    Methods:
+        for_board(board, ...)
+        add(key)
+        __contains__(key)
+        close()
+    """
+
+    def __init__(
+        self,
+        key_bits,
+        hot_limit=1_000_000,
+        directory=None,
+        bloom_bits_per_key=10,
+        max_runs=8,
+    ):
+        self.width = (key_bits + 7) // 8
+        self.hot_limit = hot_limit
+        self.bloom_bits_per_key = bloom_bits_per_key
+        self.max_runs = max_runs
+        self.hot: set[int] = set()
+        self.runs: list[_SortedRun] = []
+        self.spills = 0
+        self.disk_lookups = 0
+        self.bloom_false_positives = 0
+        self._run_number = 0
+        self._own_directory = directory is None
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="closed_set_")
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._disk_count = 0
+        # removes the runs even if close() is never called
+        self._finalizer = weakref.finalize(
+            self, DiskClosedSet._cleanup, self.runs, directory, self._own_directory
+        )
+
+    @classmethod
+    def for_board(cls, board, **options):
+        """
+        Closed set sized for a board's packed state keys
+        Arg1: any board of the puzzle                                   | ChessBoard/BitBoard
+        Arg*: keyword options of DiskClosedSet()
+
+        Return: empty closed set                                        | DiskClosedSet
+        """
+        return cls(2 * board.rows * board.cols + 1, **options)
+
+    def __len__(self):
+        return len(self.hot) + self._disk_count
+
+    def add(self, key):
+        """
+        Adds a state key, spilling the hot set if it is full
+        Arg1: state key                                                 | #
+
+        Return: Nothing
+        """
+        if key in self.hot:
+            return
+        if self.runs and key in self:
+            return
+        self.hot.add(key)
+        if len(self.hot) >= self.hot_limit:
+            self._spill()
+
+    def __contains__(self, key):
+        if key in self.hot:
+            return True
+        encoded = None
+        for run in self.runs:
+            if key in run.bloom:
+                if encoded is None:
+                    encoded = key.to_bytes(self.width, "big")
+                self.disk_lookups += 1
+                if encoded in run:
+                    return True
+                self.bloom_false_positives += 1
+        return False
+
+    def _new_path(self):
+        self._run_number += 1
+        return os.path.join(self.directory, f"run_{self._run_number:06d}.bin")
+
+    def _write_run(self, records, count, record_width=None):
+        """
+        Writes sorted records to a new run
+        Arg1: records in ascending order, each starting with its
+            encoded key                                                 | iterable[bytes]
+        Arg2: number of records, at most, sizes the Bloom filter        | #
+        Arg3: bytes per record, None when records are bare keys         | #
+
+        Return: the mapped run                                          | _SortedRun
+        """
+        width = self.width
+        bloom = BloomFilter(count, self.bloom_bits_per_key)
+        path = self._new_path()
+        written = 0
+        with open(path, "wb") as run_file:
+            for record in records:
+                bloom.add(int.from_bytes(record[:width], "big"))
+                run_file.write(record)
+                written += 1
+        return _SortedRun(path, record_width or width, written, bloom, width)
+
+    def _spill(self):
+        width = self.width
+        keys = sorted(self.hot)
+        self.runs.append(
+            self._write_run((key.to_bytes(width, "big") for key in keys), len(keys))
+        )
+        self._disk_count += len(keys)
+        self.hot.clear()
+        self.spills += 1
+        if len(self.runs) > self.max_runs:
+            self._merge_runs()
+
+    def _merge_runs(self):
+        # add() never stores a key twice, so the runs never overlap
+        old_runs = self.runs[:]
+        merged = self._write_run(heapq.merge(*old_runs), self._disk_count)
+        for run in old_runs:
+            run.close()
+        self.runs[:] = [merged]
+
+    def close(self):
+        """
+        Deletes the runs and the temporary directory
+
+        Return: Nothing
+        """
+        self._finalizer()
+        self.hot.clear()
+        self._disk_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _cleanup(runs, directory, own_directory):
+        for run in runs:
+            run.close()
+        runs.clear()
+        if own_directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+class DiskScoreMap(DiskClosedSet):
+    """
+    Map of state keys to their best g with a capped in-memory part and sorted
+    runs on disk
+    Supports the get/[]/in/len use a_star_search() and bnb_bounded() make of
+    their best g dict, so it can be passed to them as closed_set. A key is only
+    ever set to a lower g than before, so the newest entry for a key is its best.
+    len() counts a key once per run holding it until the runs are merged
+    Arg1: bits in a state key, 2 * rows * cols + 1 for the packed keys      | #
+    Arg2: entries held in memory before spilling a run                     | #
+    Arg3: directory for the runs, None for a temporary one                 | str
+    Arg4: Bloom filter bits per key, more means fewer wasted disk lookups   | #
+    Arg5: runs allowed before they are merged into one                     | #
+    Arg6: bytes per stored g                                               | #
+    Attributes:
+        spills (int): Runs written so far
+        disk_lookups (int): Lookups that reached a run past its Bloom filter
+        bloom_false_positives (int): Of those, lookups that found nothing
+    Methods:
+        for_board(board, ...)
+        get(key, default)
+        __getitem__(key)
+        __setitem__(key, g)
+        __contains__(key)
+        close()
+    """
+
+    def __init__(
+        self,
+        key_bits,
+        hot_limit=1_000_000,
+        directory=None,
+        bloom_bits_per_key=10,
+        max_runs=8,
+        value_bytes=4,
+    ):
+        super().__init__(key_bits, hot_limit, directory, bloom_bits_per_key, max_runs)
+        self.hot: dict[int, int] = {}
+        self.value_bytes = value_bytes
+
+    def add(self, key):
+        raise TypeError("DiskScoreMap stores a g per key, set it with map[key] = g")
+
+    def get(self, key, default=None):
+        """
+        Best g stored for a state key
+        Arg1: state key                                                 | #
+        Arg2: value returned when the key was never set                 | object
+
+        Return: best g, default if there is none                        | #
+        """
+        g_score = self.hot.get(key)
+        if g_score is not None:
+            return g_score
+        encoded = None
+        width = self.width
+        for run in reversed(self.runs):
+            if key in run.bloom:
+                if encoded is None:
+                    encoded = key.to_bytes(width, "big")
+                self.disk_lookups += 1
+                record = run.find(encoded)
+                if record is not None:
+                    return int.from_bytes(record[width:], "big")
+                self.bloom_false_positives += 1
+        return default
+
+    def __getitem__(self, key):
+        g_score = self.get(key)
+        if g_score is None:
+            raise KeyError(key)
+        return g_score
+
+    def __setitem__(self, key, g_score):
+        self.hot[key] = g_score
+        if len(self.hot) >= self.hot_limit:
+            self._spill()
+
+    def _spill(self):
+        width = self.width
+        value_bytes = self.value_bytes
+        hot = self.hot
+        records = (
+            key.to_bytes(width, "big") + hot[key].to_bytes(value_bytes, "big")
+            for key in sorted(hot)
+        )
+        self.runs.append(self._write_run(records, len(hot), width + value_bytes))
+        self._disk_count += len(hot)
+        hot.clear()
+        self.spills += 1
+        if len(self.runs) > self.max_runs:
+            self._merge_runs()
+
+    def _merge_runs(self):
+        # records sort by key then g, so the first record of a key holds its best g
+        width = self.width
+        old_runs = self.runs[:]
+
+        def best_records():
+            last_key = None
+            for record in heapq.merge(*old_runs):
+                key = record[:width]
+                if key != last_key:
+                    last_key = key
+                    yield record
+
+        merged = self._write_run(
+            best_records(), self._disk_count, width + self.value_bytes
+        )
+        for run in old_runs:
+            run.close()
+        self.runs[:] = [merged]
+        self._disk_count = merged.count
@@ -0,0 +1,162 @@
+"""
+Static checks that prove a puzzle unsolvable before any search runs.
+A search on an unsolvable puzzle has to exhaust every reachable state before it
+can say so, which makes it the slowest case. These checks use only the piece
+lists and per-board-size tables, so a rejection costs microseconds.
+Each check is sound: it rejects only puzzles that no sequence of moves solves.
+Puzzles that pass may still be unsolvable.
+
+Checks, in order:
+    piece counts      each color has as many knights as goal squares
+    components        knights never leave their component of the knight graph
+                      (the 3x3 center is a component of its own), so every
+                      component needs as many knights of a color as goal squares
+    turn parity       a knight move always changes square color, so the parity of
+                      each color's move count is fixed, and with alternating turns
+                      that fixes whether the side to move can match the goal's
+    stalemate         the side to move has no legal move
+    frozen opponent   the other side can never move, so at most one move is made
+"""
+
+from knight_moves import knight_move_table
+
+_component_tables: dict = {}
+
+
+def knight_components(rows: int, cols: int):
+    """
+    Component of every square in the knight graph of an empty board
+    Built once per board size
+    Arg1: number of rows on the board                                  | #
+    Arg2: number of columns on the board                               | #
+
+    Return: component number per square, numbered in square order      | tuple[#]
+    """
+    table = _component_tables.get((rows, cols))
+    if table is None:
+        moves = knight_move_table(rows, cols)
+        component = [-1] * (rows * cols)
+        number = 0
+        for source in range(rows * cols):
+            if component[source] >= 0:
+                continue
+            component[source] = number
+            stack = [source]
+            while stack:
+                square = stack.pop()
+                for _, (row, col) in moves[square]:
+                    dest = row * cols + col
+                    if component[dest] < 0:
+                        component[dest] = number
+                        stack.append(dest)
+            number += 1
+        table = tuple(component)
+        _component_tables[(rows, cols)] = table
+    return table
+
+
+def _component_counts(components, pos_list, cols):
+    """
+    Knights per component
+    """
+    counts: dict = {}
+    for row, col in pos_list:
+        component = components[row * cols + col]
+        counts[component] = counts.get(component, 0) + 1
+    return counts
+
+
+def _color_parity(pos_list):
+    """
+    Parity of the number of knights standing on dark squares
+    """
+    return sum(row + col for row, col in pos_list) % 2
+
+
+def _has_move(board, pos_list):
+    """
+    If any of the knights has a legal move
+    """
+    for pos in pos_list:
+        if board.valid_moves(pos):
+            return True
+    return False
+
+
+def _can_ever_move(board, pos_list):
+    """
+    If any of the knights has a square to go to on an empty board
+    Blocked knights may be freed later, knights with no knight moves never are
+    """
+    moves = knight_move_table(board.rows, board.cols)
+    cols = board.cols
+    for row, col in pos_list:
+        if moves[row * cols + col]:
+            return True
+    return False
+
+
+def _is_goal(board, goal_board, match_turn):
+    if match_turn:
+        return board == goal_board
+    return board.same_pieces(goal_board)
+
+
+def infeasibility_reason(start_board, goal_board, match_turn=True):
+    """
+    Proves a puzzle unsolvable without searching, when it can
+    Arg1: start board                                                  | ChessBoard/BitBoard
+    Arg2: goal board                                                   | ChessBoard/BitBoard
+    Arg3: if the goal test also checks the side to move                | Bool
+
+    Return: why no path exists, None if no check rules one out         | str
+    """
+    if (start_board.rows, start_board.cols) != (goal_board.rows, goal_board.cols):
+        return "start and goal boards differ in size"
+    if _is_goal(start_board, goal_board, match_turn):
+        return None
+    white = start_board.white_knight_pos_list
+    black = start_board.black_knight_pos_list
+    goal_white = goal_board.white_knight_pos_list
+    goal_black = goal_board.black_knight_pos_list
+    colors = (("white", white, goal_white), ("black", black, goal_black))
+    for name, pos_list, goal_pos_list in colors:
+        if len(pos_list) != len(goal_pos_list):
+            return (
+                f"{name} has {len(pos_list)} knights but the goal has "
+                f"{len(goal_pos_list)}"
+            )
+    cols = start_board.cols
+    components = knight_components(start_board.rows, cols)
+    for name, pos_list, goal_pos_list in colors:
+        counts = _component_counts(components, pos_list, cols)
+        if counts != _component_counts(components, goal_pos_list, cols):
+            return (
+                f"a {name} knight would have to leave its component of the knight "
+                "graph (an isolated square or a cut-off region)"
+            )
+    if match_turn:
+        white_flips = _color_parity(white) != _color_parity(goal_white)
+        black_flips = _color_parity(black) != _color_parity(goal_black)
+        # same side to move means an even total, both colors move equally often
+        same_turn = start_board.current_turn == goal_board.current_turn
+        if same_turn != (white_flips == black_flips):
+            return (
+                "square color parity: the knights' move counts can't match the "
+                "goal's side to move"
+            )
+    if start_board.current_turn == "W":
+        to_move, other = white, black
+    else:
+        to_move, other = black, white
+    if not _has_move(start_board, to_move):
+        return "the side to move has no legal move"
+    if not _can_ever_move(start_board, other):
+        # only the first move can be made
+        for pos in to_move:
+            for dest in start_board.valid_moves(pos):
+                child_board = start_board.make_move(pos, dest)
+                if _is_goal(child_board, goal_board, match_turn):
+                    return None
+        return "the side not to move can never move, so only one move can be made"
+    return None
@@ -14,9 +14,11 @@ Basic environment is a simplified version of the Four Knights Puzzle
 import sys
 import time
 from setup_board import setup_board
-from a_star import a_star
-from branch_and_bound import bnb
+from a_star import a_star_search
+from branch_and_bound import bnb_bounded
 from node import Node
+from pattern_database import DEFAULT_CACHE_DIR, PatternDatabaseHeuristic
+from solution_cache import DEFAULT_CACHE_FILE, SolutionCache
 
 
 def print_path(node_list: list[Node]):
@@ -33,14 +35,46 @@ def print_path(node_list: list[Node]):
 def main():
     """
     Main wrapper function
+    --cache keeps pattern databases and solved puzzles in the user's cache
+    directory between runs
     """
+    args = sys.argv[1:]
+    pdb_cache_dir = None
+    cache_file = None
+    if "--cache" in args:
+        args.remove("--cache")
+        pdb_cache_dir = DEFAULT_CACHE_DIR
+        cache_file = DEFAULT_CACHE_FILE
     # setup boards.  Start is default.  Goal is explicit here
     start_state, goal_state = setup_board(4)
-    if len(sys.argv) == 2:
-        if sys.argv[1] == "-a":
+    with SolutionCache(path=cache_file) as cache:
+        run_searches(start_state, goal_state, cache, args, pdb_cache_dir)
+
+
+def run_searches(
+    start_state: Node,
+    goal_state: Node,
+    cache: SolutionCache,
+    args=(),
+    pdb_cache_dir=None,
+):
+    """
+    Runs the searches asked for on the command line
+    Solved puzzles and their symmetric copies are answered from the cache
+    Arg1: start node                                                    | Node
+    Arg2: destination node                                              | Node
+    Arg3: cache of earlier solutions                                    | SolutionCache
+    Arg4: command line arguments without the program name               | list[str]
+    Arg5: directory pattern databases are saved to, None keeps them
+        in memory                                                       | str
+
+    Return: Nothing
+    """
+    if len(args) == 1:
+        if args[0] == "-a":
             # run only astar search
             print("not implemented")
-        elif sys.argv[1] == "-b":
+        elif args[0] == "-b":
             # run only branch and bound search
             print("not implemented")
         else:
@@ -50,10 +84,21 @@ def main():
 
         # run and print A*
         start_time = time.time()
-        a_star_path = a_star(start_state, goal_state)
+        # with a cache directory, tables are loaded from disk after the first run
+        a_star_result = cache.solve(
+            start_state,
+            goal_state,
+            lambda start, goal: a_star_search(
+                start,
+                goal,
+                PatternDatabaseHeuristic(goal.board, cache_dir=pdb_cache_dir),
+            ),
+            "a_star_search_pdb",
+        )
+        a_star_path = a_star_result.path
         a_star_time = time.time() - start_time
-        if isinstance(a_star_path, str):
-            print(a_star_path)
+        if a_star_path is None:
+            print("no path found")
         else:
             print(
                 f"A* Solution: ({len(a_star_path) - 1} moves!) (Runtime: {a_star_time:.5f} s)"
@@ -62,23 +107,29 @@ def main():
 
         # run and print Branch and Bound
         start_time = time.time()
-        bnb_path = bnb(start_state, goal_state)
+        bnb_path = cache.solve(start_state, goal_state, bnb_bounded).path
         bnb_time = time.time() - start_time
-        if isinstance(bnb_path, str):
-            print(bnb_path)
+        if bnb_path is None:
+            print("no path found")
         else:
             print(
                 f"Branch and Bound Solution: ({len(bnb_path) - 1} moves!) (Runtime: {bnb_time:.5f} s)"
             )
             print_path(bnb_path)
 
-        move_dif = abs(len(a_star_path) - len(bnb_path))
-        if len(a_star_path) > len(bnb_path):
-            print(f"Branch and Bound path wins by {move_dif} moves!")
-        elif len(a_star_path) < len(bnb_path):
-            print(f"A* path wins by {move_dif} moves!")
-        else:
-            print("Equally optimal paths found by both algorithms!")
+        if a_star_path is not None and bnb_path is not None:
+            move_dif = abs(len(a_star_path) - len(bnb_path))
+            if len(a_star_path) > len(bnb_path):
+                print(f"Branch and Bound path wins by {move_dif} moves!")
+            elif len(a_star_path) < len(bnb_path):
+                print(f"A* path wins by {move_dif} moves!")
+            else:
+                print("Equally optimal paths found by both algorithms!")
+        cache_stats = cache.stats
+        print(
+            f"Solution cache: {cache_stats['hits']} hits, "
+            f"{cache_stats['suffix_hits']} suffix hits, {cache_stats['misses']} misses"
+        )
 
 
 if __name__ == "__main__":
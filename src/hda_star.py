@@ -0,0 +1,282 @@
+"""
+Hash distributed A* (HDA*) across worker processes.
+Every state has one owning worker picked from a hash of its state key. A worker keeps
+the open list and best g of the states it owns, expands them with Node.iter_children()
+and sends children owned by other workers to them in batches through queues.
+The cheapest goal cost found so far is shared, and every worker drops nodes whose
+f score can't beat it. The run ends once every worker is idle and every sent batch
+has been received. Nothing cheaper can still be in the system at that point, so the
+shared cost is optimal for an admissible heuristic.
+
+Workers are started with the default multiprocessing start method. Under fork (the
+Linux default) the heuristic is inherited; elsewhere it has to be picklable.
+Pool workers can't start processes of their own, so batch_solve.py can't run it
+(it is listed in solvers.PROCESS_SOLVERS, which batch_solve.py leaves out).
+"""
+
+from itertools import count
+from math import inf
+from multiprocessing import Lock, Process, Queue, RawArray, RawValue, cpu_count
+from queue import Empty
+from time import sleep
+from bit_board import BitBoard
+from chess_board import ChessBoard
+from node import Node
+from search_result import SearchResult
+import heapq
+
+_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def state_owner(state_key: int, workers: int) -> int:
+    """
+    Worker owning a state
+    Keys are raw bitmasks whose low bits barely change between
+    neighbouring states, so they are mixed before taking the remainder
+    Arg1: packed state key                                              | #
+    Arg2: number of workers                                             | #
+
+    Return: owning worker index                                         | #
+    """
+    return (((hash(state_key) * _MIX) & _MASK64) >> 32) % workers
+
+
+class _Worker:
+    """
+    Search state of one worker process
+    Messages on the inbox:
+        ("nodes", [(state key, g, parent key), ...])
+        ("parent", state key), answered on the result queue
+        ("stop",), answered with the worker's counts
+    """
+
+    def __init__(self, index, settings, queues, shared):
+        self.index = index
+        (
+            self.workers,
+            self.rows,
+            self.cols,
+            self.goal_key,
+            self.goal_board,
+            self.heuristic,
+            self.batch_size,
+        ) = settings
+        self.inboxes, self.results = queues
+        self.sent, self.received, self.idle, self.incumbent, self.lock = shared
+        self.open_heap: list = []
+        self.best_g: dict[int, int] = {}
+        self.parent: dict[int, int] = {}
+        self.outboxes = [[] for _ in range(self.workers)]
+        self.tie_breaker = count()
+        self.expanded = 0
+        self.generated = 0
+        self.stopped = False
+
+    def run(self):
+        inbox = self.inboxes[self.index]
+        while not self.stopped:
+            self.drain(inbox)
+            if self.stopped:
+                break
+            if not self.expand_some(64):
+                # nothing worth expanding, hand over what is queued and wait
+                self.flush()
+                self.idle[self.index] = 1
+                try:
+                    message = inbox.get(timeout=0.01)
+                except Empty:
+                    continue
+                self.handle(message)
+            else:
+                self.flush()
+
+    def drain(self, inbox):
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except Empty:
+                return
+            self.handle(message)
+
+    def handle(self, message):
+        kind = message[0]
+        if kind == "nodes":
+            # mark busy before counting so the coordinator never sees
+            # every batch received while this one is still being handled
+            self.idle[self.index] = 0
+            self.received[self.index] += 1
+            for state_key, g_score, parent_key in message[1]:
+                self.add(state_key, g_score, parent_key)
+        elif kind == "parent":
+            self.results.put(("parent", message[1], self.parent.get(message[1])))
+        elif kind == "stop":
+            self.stopped = True
+            self.results.put(("counts", self.index, self.expanded, self.generated))
+
+    def add(self, state_key, g_score, parent_key, board=None):
+        if g_score >= self.best_g.get(state_key, inf):
+            return
+        self.best_g[state_key] = g_score
+        self.parent[state_key] = parent_key
+        if board is None:
+            board = BitBoard.from_state_key(self.rows, self.cols, state_key)
+        node = Node(board, g_score)
+        self.heuristic(node, self.goal_board)
+        if node.f_score < self.incumbent.value:
+            heapq.heappush(
+                self.open_heap,
+                (node.f_score, node.h_score, next(self.tie_breaker), state_key, node),
+            )
+
+    def expand_some(self, limit):
+        """
+        Expands up to limit open nodes
+
+        Return: if any node was worth expanding                         | Bool
+        """
+        worked = False
+        for _ in range(limit):
+            node = None
+            while self.open_heap:
+                f_score, _, _, state_key, node = heapq.heappop(self.open_heap)
+                if f_score >= self.incumbent.value:
+                    # sorted by f, so nothing left here can beat the incumbent
+                    self.open_heap.clear()
+                    node = None
+                elif node.g_score > self.best_g[state_key]:
+                    node = None  # stale, a cheaper copy was pushed later
+                else:
+                    break
+            if node is None:
+                return worked
+            worked = True
+            if state_key == self.goal_key:
+                with self.lock:
+                    if node.g_score < self.incumbent.value:
+                        self.incumbent.value = node.g_score
+                continue
+            self.expanded += 1
+            for child in node.iter_children():
+                self.generated += 1
+                child_key = child.board.state_key
+                owner = state_owner(child_key, self.workers)
+                if owner == self.index:
+                    self.add(child_key, child.g_score, state_key, child.board)
+                else:
+                    outbox = self.outboxes[owner]
+                    outbox.append((child_key, child.g_score, state_key))
+                    if len(outbox) >= self.batch_size:
+                        self.send(owner)
+        return worked
+
+    def send(self, owner):
+        self.sent[self.index] += 1
+        self.inboxes[owner].put(("nodes", self.outboxes[owner]))
+        self.outboxes[owner] = []
+
+    def flush(self):
+        for owner in range(self.workers):
+            if self.outboxes[owner]:
+                self.send(owner)
+
+
+def _run_worker(index, settings, queues, shared):
+    _Worker(index, settings, queues, shared).run()
+
+
+def hda_star(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=Node.calc_heuristic,
+    workers=None,
+    batch_size=64,
+):
+    """
+    Hash Distributed A* Algorithm
+    Goal test covers the side to move like a_star_search()
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: admissible heuristic with the Node.calc_heuristic signature         | Callable
+    Arg4: number of worker processes, None for every core                     | #
+    Arg5: children sent to another worker in one queue message                | #
+
+    Return: optimal path, summed expanded/generated counts                    | SearchResult
+        stats["expanded_per_worker"] shows how evenly the hash split the work
+    """
+    if workers is None:
+        workers = cpu_count()
+    start_board = start_state.board
+    goal_board = goal_state.board
+    rows, cols = start_board.rows, start_board.cols
+    start_key = start_board.state_key
+    goal_key = goal_board.state_key
+    if start_key == goal_key:
+        return SearchResult([Node(start_board)], 0, 0, {"workers": workers})
+    inboxes = [Queue() for _ in range(workers)]
+    results = Queue()
+    # slot [workers] of sent counts the coordinator's own start batch
+    sent = RawArray("q", workers + 1)
+    received = RawArray("q", workers)
+    idle = RawArray("b", workers)
+    incumbent = RawValue("d", inf)
+    lock = Lock()
+    settings = (workers, rows, cols, goal_key, goal_board, heuristic, batch_size)
+    queues = (inboxes, results)
+    shared = (sent, received, idle, incumbent, lock)
+    processes = [
+        Process(target=_run_worker, args=(index, settings, queues, shared), daemon=True)
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        sent[workers] = 1
+        inboxes[state_owner(start_key, workers)].put(("nodes", [(start_key, 0, None)]))
+        # Quiet once two snapshots in a row agree, show every worker idle
+        # and every sent batch received
+        previous = None
+        while True:
+            sleep(0.002)
+            snapshot = (tuple(sent), tuple(received), tuple(idle))
+            quiet = all(snapshot[2]) and sum(snapshot[0]) == sum(snapshot[1])
+            if quiet and snapshot == previous:
+                break
+            previous = snapshot if quiet else None
+        path = None
+        if incumbent.value < inf:
+            keys = [goal_key]
+            while keys[-1] != start_key:
+                inboxes[state_owner(keys[-1], workers)].put(("parent", keys[-1]))
+                keys.append(results.get()[2])
+            keys.reverse()
+            path = []
+            for g_score, state_key in enumerate(keys):
+                board = BitBoard.from_state_key(rows, cols, state_key)
+                if isinstance(start_board, ChessBoard):
+                    board = ChessBoard(board.board_state, board.current_turn)
+                path.append(Node(board, g_score, 0, path[-1] if path else None))
+        for inbox in inboxes:
+            inbox.put(("stop",))
+        expanded_per_worker = [0] * workers
+        generated = 0
+        for _ in range(workers):
+            _, index, worker_expanded, worker_generated = results.get()
+            expanded_per_worker[index] = worker_expanded
+            generated += worker_generated
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    return SearchResult(
+        path,
+        sum(expanded_per_worker),
+        generated,
+        {
+            "workers": workers,
+            "messages": sum(sent),
+            "expanded_per_worker": expanded_per_worker,
+        },
+    )
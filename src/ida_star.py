@@ -0,0 +1,116 @@
+"""
+Iterative deepening A* (IDA*) that calculates the optimal path from source to destination.
+Runs depth-first passes bounded by an f score threshold, raising the threshold
+to the smallest f score that went over it after every pass.
+Memory is linear in the path depth: only the current path and a lazy child
+generator per level are kept, plus an optional fixed size transposition table.
+"""
+
+from math import inf
+from feasibility import infeasibility_reason
+from node import Node
+from search_result import SearchResult
+
+
+def ida_star(
+    start_state: Node,
+    goal_state: Node,
+    heuristic=Node.calc_heuristic,
+    table_size: int = 0,
+    precheck=True,
+):
+    """
+    IDA* Algorithm
+    Goal test covers the side to move like a_star_search()
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: function that sets h_score and f_score of a node for a goal board   | Callable
+    Arg4: max entries in the transposition table, 0 turns it off              | #
+        The table remembers the lowest g each state was reached with during a pass
+        and prunes later visits that are no cheaper. It is cleared between passes
+        and stops taking new states once full.
+    Arg5: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                       | Bool
+
+    Return: path, cost and expanded/generated counts                          | SearchResult
+        stats["iterations"] holds one dict per pass:
+        threshold, expanded and generated
+        stats["infeasible"] holds the reason when the precheck ruled it out
+    """
+    goal_board = goal_state.board
+    iterations = []
+    reason = infeasibility_reason(start_state.board, goal_board) if precheck else None
+    if reason is not None:
+        return SearchResult(
+            None, 0, 0, {"iterations": iterations, "infeasible": reason}
+        )
+    start_node = Node(start_state.board)
+    heuristic(start_node, goal_board)
+    expanded = 0
+    generated = 0
+    if start_node.board == goal_board:
+        return SearchResult([start_node], 0, 0, {"iterations": iterations})
+    threshold = start_node.f_score
+    if threshold == inf:
+        # the heuristic proves the goal unreachable, no pass would prune anything
+        return SearchResult(None, 0, 0, {"iterations": iterations})
+    while True:
+        pass_expanded = 1
+        pass_generated = 0
+        next_threshold = inf
+        table: dict[int, int] = {}
+        on_path = {start_node.board.state_key}
+        stack = [(start_node, start_node.iter_children())]
+        goal_node = None
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                on_path.discard(node.board.state_key)
+                continue
+            pass_generated += 1
+            key = child.board.state_key
+            if key in on_path:
+                continue  # walking back into the current path
+            heuristic(child, goal_board)
+            if child.f_score == inf:
+                continue  # the goal can't be reached from this child
+            if child.f_score > threshold:
+                if child.f_score < next_threshold:
+                    next_threshold = child.f_score
+                continue
+            if child.board == goal_board:
+                goal_node = child
+                break
+            if table_size:
+                seen_g = table.get(key)
+                if seen_g is not None:
+                    if seen_g <= child.g_score:
+                        continue
+                    table[key] = child.g_score
+                elif len(table) < table_size:
+                    table[key] = child.g_score
+            pass_expanded += 1
+            on_path.add(key)
+            stack.append((child, child.iter_children()))
+        iterations.append(
+            {
+                "threshold": threshold,
+                "expanded": pass_expanded,
+                "generated": pass_generated,
+            }
+        )
+        expanded += pass_expanded
+        generated += pass_generated
+        if goal_node is not None:
+            optimal_path = []
+            while goal_node is not None:
+                optimal_path.append(goal_node)
+                goal_node = goal_node.parent
+            return SearchResult(
+                optimal_path[::-1], expanded, generated, {"iterations": iterations}
+            )
+        if next_threshold == inf:
+            return SearchResult(None, expanded, generated, {"iterations": iterations})
+        threshold = next_threshold
@@ -0,0 +1,282 @@
+"""
+Optional instrumentation for the search loops.
+Solvers take an observer argument and call its hooks at key events: expand, generate,
+prune and goal. With observer=None the solvers skip every hook and timer, so a
+disabled run pays only an "is None" test per event.
+"""
+
+import json
+import time
+
+PHASES = ("move_generation", "copy", "heuristic")
+
+
+class SearchObserver:
+    """
+    Base observer, every hook does nothing
+    Methods:
+        on_expand(node, open_size, closed_size)
+        on_generate(node)
+        on_prune(node, reason)
+        on_goal(node)
+        on_phase(phase, seconds)
+        summary()
+    """
+
+    def on_expand(self, node, open_size, closed_size):
+        pass
+
+    def on_generate(self, node):
+        pass
+
+    def on_prune(self, node, reason):
+        pass
+
+    def on_goal(self, node):
+        pass
+
+    def on_phase(self, phase, seconds):
+        pass
+
+    def summary(self) -> dict:
+        return {}
+
+
+class CounterCollector(SearchObserver):
+    """
+    Counts events, prunes are counted per reason
+    duplicate_rate is the share of generated nodes dropped as already seen
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.goals = 0
+        self.pruned: dict[str, int] = {}
+
+    def on_expand(self, node, open_size, closed_size):
+        self.expanded += 1
+
+    def on_generate(self, node):
+        self.generated += 1
+
+    def on_prune(self, node, reason):
+        self.pruned[reason] = self.pruned.get(reason, 0) + 1
+
+    def on_goal(self, node):
+        self.goals += 1
+
+    def summary(self) -> dict:
+        duplicates = sum(
+            count for reason, count in self.pruned.items() if reason != "bound"
+        )
+        return {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "goals": self.goals,
+            "pruned": dict(self.pruned),
+            "duplicate_rate": duplicates / self.generated if self.generated else 0.0,
+        }
+
+
+class PhaseTimer(SearchObserver):
+    """
+    Adds up the time the solver spends in each phase
+    Phases: move_generation (finding legal moves), copy (building child boards/nodes)
+    and heuristic (calc_heuristic or its replacement)
+    """
+
+    def __init__(self):
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.calls = {phase: 0 for phase in PHASES}
+
+    def on_phase(self, phase, seconds):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def summary(self) -> dict:
+        return {"phase_seconds": dict(self.seconds), "phase_calls": dict(self.calls)}
+
+
+class SizeSampler(SearchObserver):
+    """
+    Records open list and closed set sizes every interval expansions
+    Arg1: expansions between samples                                    | #
+    """
+
+    def __init__(self, interval=100):
+        self.interval = interval
+        self.samples: list[tuple] = []
+        self._expanded = 0
+
+    def on_expand(self, node, open_size, closed_size):
+        if self._expanded % self.interval == 0:
+            self.samples.append((self._expanded, open_size, closed_size))
+        self._expanded += 1
+
+    def summary(self) -> dict:
+        return {
+            "size_samples": list(self.samples),
+            "peak_open": max((sample[1] for sample in self.samples), default=0),
+            "peak_closed": max((sample[2] for sample in self.samples), default=0),
+        }
+
+
+class ProgressReporter(SearchObserver):
+    """
+    Calls a function with the search progress every interval expansions
+    and whenever a goal is reached (branch and bound reaches one per better path)
+    The function gets a dict: expanded, open, closed, g, f, seconds and goal
+    Arg1: function taking the progress dict                             | Callable
+    Arg2: expansions between calls                                      | #
+    """
+
+    def __init__(self, callback, interval=1000):
+        self.callback = callback
+        self.interval = interval
+        self._expanded = 0
+        self._open = 0
+        self._closed = 0
+        self._start = time.perf_counter()
+
+    def _report(self, node, goal):
+        self.callback(
+            {
+                "expanded": self._expanded,
+                "open": self._open,
+                "closed": self._closed,
+                "g": node.g_score,
+                "f": node.f_score,
+                "seconds": time.perf_counter() - self._start,
+                "goal": goal,
+            }
+        )
+
+    def on_expand(self, node, open_size, closed_size):
+        self._expanded += 1
+        self._open = open_size
+        self._closed = closed_size
+        if self._expanded % self.interval == 0:
+            self._report(node, False)
+
+    def on_goal(self, node):
+        self._report(node, True)
+
+
+class TraceWriter(SearchObserver):
+    """
+    Writes events as JSON lines to a trace file
+    Arg1: path of the trace file                                        | str
+    Arg2: event names to write, None for all of them                    | set[str]
+    Call close() (or use it as a context manager) when the search is done
+    """
+
+    def __init__(self, path, events=None):
+        self.events = events
+        self._file = open(path, "w")
+        self._start = time.perf_counter()
+
+    def _write(self, event, **fields):
+        if self.events is None or event in self.events:
+            fields["event"] = event
+            fields["t"] = time.perf_counter() - self._start
+            self._file.write(json.dumps(fields) + "\n")
+
+    def on_expand(self, node, open_size, closed_size):
+        self._write(
+            "expand", g=node.g_score, h=node.h_score, open=open_size, closed=closed_size
+        )
+
+    def on_generate(self, node):
+        self._write("generate", g=node.g_score)
+
+    def on_prune(self, node, reason):
+        self._write("prune", g=node.g_score, reason=reason)
+
+    def on_goal(self, node):
+        self._write("goal", g=node.g_score)
+
+    def on_phase(self, phase, seconds):
+        self._write("phase", phase=phase, seconds=seconds)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MultiObserver(SearchObserver):
+    """
+    Forwards every event to several observers and merges their summaries
+    Arg*: observers to forward to                                       | SearchObserver
+    """
+
+    def __init__(self, *observers):
+        self.observers = observers
+
+    def on_expand(self, node, open_size, closed_size):
+        for observer in self.observers:
+            observer.on_expand(node, open_size, closed_size)
+
+    def on_generate(self, node):
+        for observer in self.observers:
+            observer.on_generate(node)
+
+    def on_prune(self, node, reason):
+        for observer in self.observers:
+            observer.on_prune(node, reason)
+
+    def on_goal(self, node):
+        for observer in self.observers:
+            observer.on_goal(node)
+
+    def on_phase(self, phase, seconds):
+        for observer in self.observers:
+            observer.on_phase(phase, seconds)
+
+    def summary(self) -> dict:
+        merged = {}
+        for observer in self.observers:
+            merged.update(observer.summary())
+        return merged
+
+
+def timed_children(node, observer):
+    """
+    Same children as Node.iter_children() with move generation and copying timed
+    Only used when an observer is attached
+    Arg1: node to expand                                                | Node
+    Arg2: observer receiving on_phase and on_generate                   | SearchObserver
+
+    Return: generator of child nodes                                    | Node
+    """
+    clock = time.perf_counter
+    start_time = clock()
+    pos_list, dest_list = node.get_knights_moves()
+    observer.on_phase("move_generation", clock() - start_time)
+    for i, pos in enumerate(pos_list):
+        for dest in dest_list[i]:
+            start_time = clock()
+            child = node.make_child(pos, dest)
+            observer.on_phase("copy", clock() - start_time)
+            observer.on_generate(child)
+            yield child
+
+
+def timed_heuristic(heuristic, node, goal_board, observer):
+    """
+    Runs a heuristic and reports its time to the observer
+    Arg1: heuristic with the Node.calc_heuristic signature              | Callable
+    Arg2: node to score                                                 | Node
+    Arg3: goal board                                                    | ChessBoard/BitBoard
+    Arg4: observer receiving on_phase                                   | SearchObserver
+
+    Return: Nothing
+    """
+    start_time = time.perf_counter()
+    heuristic(node, goal_board)
+    observer.on_phase("heuristic", time.perf_counter() - start_time)
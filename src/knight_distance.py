@@ -0,0 +1,174 @@
+"""
+Exact knight distance tables and the assignment lower bound built on them.
+Distances are found once per board size by breadth-first search on an empty board,
+so estimating a child is a handful of table lookups.
+Ignoring blocking pieces can only make a distance shorter, keeping the bound admissible.
+"""
+
+from itertools import permutations
+from math import inf
+from knight_moves import knight_move_table
+
+_distance_tables: dict = {}
+
+
+def knight_distance_table(rows: int, cols: int):
+    """
+    Knight move distances between every pair of squares on an empty board
+    Built once per board size
+    Arg1: number of rows on the board                                  | #
+    Arg2: number of columns on the board                               | #
+
+    Return: table[from_square][to_square], inf when unreachable        | tuple[tuple]
+    """
+    table = _distance_tables.get((rows, cols))
+    if table is None:
+        moves = knight_move_table(rows, cols)
+        table = []
+        for source in range(rows * cols):
+            distances = [inf] * (rows * cols)
+            distances[source] = 0
+            layer = [source]
+            while layer:
+                next_layer = []
+                for square in layer:
+                    for _, (row, col) in moves[square]:
+                        dest = row * cols + col
+                        if distances[dest] == inf:
+                            distances[dest] = distances[square] + 1
+                            next_layer.append(dest)
+                layer = next_layer
+            table.append(tuple(distances))
+        table = tuple(table)
+        _distance_tables[(rows, cols)] = table
+    return table
+
+
+def matching_lower_bound(distances, sources, targets):
+    """
+    Cheapest way to send every knight of one color to a distinct target square
+    Arg1: knight distance table for the board size                     | tuple[tuple]
+    Arg2: square indexes of the knights                                | [#]
+    Arg3: square indexes of their goal squares                         | [#]
+
+    Return: minimum total knight moves over all assignments            | #
+    """
+    if len(sources) == 2:
+        first, second = distances[sources[0]], distances[sources[1]]
+        straight = first[targets[0]] + second[targets[1]]
+        crossed = first[targets[1]] + second[targets[0]]
+        return straight if straight < crossed else crossed
+    if len(sources) <= 4:
+        best = inf
+        for order in permutations(targets):
+            total = 0
+            for source, target in zip(sources, order):
+                total += distances[source][target]
+            if total < best:
+                best = total
+        return best
+    # More knights: assign them in order over subsets of used targets,
+    # K * 2^K steps instead of K! orderings
+    knights = len(sources)
+    cheapest = [inf] * (1 << knights)
+    cheapest[0] = 0
+    for used in range(1 << knights):
+        total = cheapest[used]
+        if total == inf:
+            continue
+        knight = bin(used).count("1")
+        if knight == knights:
+            continue
+        row = distances[sources[knight]]
+        for i, target in enumerate(targets):
+            bit = 1 << i
+            if not used & bit and total + row[target] < cheapest[used | bit]:
+                cheapest[used | bit] = total + row[target]
+    return cheapest[-1]
+
+
+def alternating_moves(to_move_need, other_need, same_turn=None):
+    """
+    Fewest total moves when the two sides must alternate
+    The side to move makes ceil(L/2) of L moves and the other side floor(L/2).
+    Every move flips the square color of one knight, so each side's move count
+    has the same parity as its matching bound.
+    Arg1: moves the side to move needs at least                        | #
+    Arg2: moves the other side needs at least                          | #
+    Arg3: if the goal has the same side to move (L even), None for any | Bool
+
+    Return: lower bound on the number of moves, inf if none fits       | #
+    """
+    if to_move_need == inf or other_need == inf:
+        return inf
+    total = max(to_move_need + other_need, 2 * to_move_need - 1, 2 * other_need)
+    for moves in range(total, total + 4):
+        to_move_moves = moves - moves // 2
+        other_moves = moves // 2
+        if (to_move_moves - to_move_need) % 2 or (other_moves - other_need) % 2:
+            continue
+        if same_turn is not None and same_turn != (moves % 2 == 0):
+            continue
+        return moves
+    return inf
+
+
+def color_need(board, goal_board, color):
+    """
+    Matching bound of one color, the part of knight_heuristic() a move of
+    the other color leaves unchanged
+    Arg1: current board                                                | ChessBoard/BitBoard
+    Arg2: goal board                                                   | ChessBoard/BitBoard
+    Arg3: "W" or "B"                                                   | char
+
+    Return: fewest moves that color's knights need, inf if unreachable | #
+    """
+    cols = board.cols
+    if color == "W":
+        pos_list = board.white_knight_pos_list
+        goal_pos_list = goal_board.white_knight_pos_list
+    else:
+        pos_list = board.black_knight_pos_list
+        goal_pos_list = goal_board.black_knight_pos_list
+    return matching_lower_bound(
+        knight_distance_table(board.rows, cols),
+        [row * cols + col for row, col in pos_list],
+        [row * cols + col for row, col in goal_pos_list],
+    )
+
+
+def combine_needs(board, goal_board, white_need, black_need, match_turn=True):
+    """
+    knight_heuristic() from the two colors' matching bounds
+    Arg1: current board                                                | ChessBoard/BitBoard
+    Arg2: goal board                                                   | ChessBoard/BitBoard
+    Arg3: color_need() of white                                        | #
+    Arg4: color_need() of black                                        | #
+    Arg5: if the goal test also checks the side to move                | Bool
+
+    Return: lower bound on the moves to the goal, inf if unreachable  | #
+    """
+    same_turn = None
+    if match_turn:
+        same_turn = board.current_turn == goal_board.current_turn
+    if board.current_turn == "W":
+        return alternating_moves(white_need, black_need, same_turn)
+    return alternating_moves(black_need, white_need, same_turn)
+
+
+def knight_heuristic(board, goal_board, match_turn=True):
+    """
+    Admissible estimate of the moves left to reach the goal board
+    Arg1: current board                                                | ChessBoard/BitBoard
+    Arg2: goal board                                                   | ChessBoard/BitBoard
+    Arg3: if the goal test also checks the side to move                | Bool
+
+    Return: lower bound on the moves to the goal, inf if unreachable  | #
+    """
+    return combine_needs(
+        board,
+        goal_board,
+        color_need(board, goal_board, "W"),
+        color_need(board, goal_board, "B"),
+        match_turn,
+    )
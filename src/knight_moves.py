@@ -0,0 +1,45 @@
+"""
+Knight move offsets and the per-size destination tables shared by both boards.
+A table lists every square's in-bounds knight destinations, so generating moves
+costs a few lookups per knight whatever the board size.
+"""
+
+# Same order as the relative moves the list based board always used, so both
+# boards generate children in the same order and A*/BnB walk the same paths
+KNIGHT_OFFSETS = (
+    (2, 1),
+    (1, 2),
+    (-1, 2),
+    (-2, 1),
+    (-2, -1),
+    (-1, -2),
+    (1, -2),
+    (2, -1),
+)
+
+_knight_tables: dict = {}
+
+
+def knight_move_table(rows: int, cols: int):
+    """
+    Precomputes the knight destinations of every square for a board size
+    Built once per size and shared by every board of that size
+    Arg1: number of rows on the board                                  | #
+    Arg2: number of columns on the board                               | #
+
+    Return: per square index, tuple of (destination bit, (row, col))   | tuple
+    """
+    table = _knight_tables.get((rows, cols))
+    if table is None:
+        table = []
+        for row in range(rows):
+            for col in range(cols):
+                moves = []
+                for d_row, d_col in KNIGHT_OFFSETS:
+                    n_row, n_col = row + d_row, col + d_col
+                    if 0 <= n_row < rows and 0 <= n_col < cols:
+                        moves.append((1 << (n_row * cols + n_col), (n_row, n_col)))
+                table.append(tuple(moves))
+        table = tuple(table)
+        _knight_tables[(rows, cols)] = table
+    return table
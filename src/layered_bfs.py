@@ -0,0 +1,219 @@
+"""
+Breadth-first search that keeps each depth as one sorted array of state indexes.
+Every move costs 1, so the layers replace a priority queue. A layer is built whole,
+then sorted and deduplicated in one call, and states already seen are removed
+against a window of earlier layers instead of checking a hash set child by child.
+States are StateIndexer ranks (8 bytes each with NumPy) instead of Node objects,
+and no parent links are kept. The path is rebuilt afterwards by a backward sweep
+that looks for a predecessor of each state in the layer before it.
+With a bounded window, a one byte per state map of the states seen so far stops
+the search once a layer holds nothing new, see layered_bfs().
+
+NumPy is used for the sort/unique/membership steps when it is installed.
+Without it the same steps run on Python sets and sorted arrays.
+"""
+
+from array import array
+from bisect import bisect_left
+from bit_board import BitBoard
+from chess_board import ChessBoard
+from feasibility import infeasibility_reason
+from knight_moves import knight_move_table
+from node import Node
+from search_result import SearchResult
+from state_index import StateIndexer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _unique(ranks):
+    """
+    Sorted unique copy of a list of ranks
+    Arg1: ranks in any order                                            | list[#]
+
+    Return: sorted ranks, one of each                                   | ndarray/array
+    """
+    if np is not None:
+        return np.unique(np.array(ranks, dtype=np.int64))
+    return array("q", sorted(set(ranks)))
+
+
+def _remove_seen(layer, seen):
+    """
+    Ranks of a sorted layer that are not in another sorted layer
+    Arg1: sorted unique ranks                                           | ndarray/array
+    Arg2: sorted unique ranks already seen                              | ndarray/array
+
+    Return: the new ranks, still sorted                                 | ndarray/array
+    """
+    if len(seen) == 0 or len(layer) == 0:
+        return layer
+    if np is not None:
+        return layer[~np.isin(layer, seen, assume_unique=True)]
+    seen_set = set(seen)
+    return array("q", [rank for rank in layer if rank not in seen_set])
+
+
+def _mark_seen(visited, layer):
+    """
+    Marks the ranks of a layer as seen
+    Arg1: one flag per state rank                                       | ndarray/bytearray
+    Arg2: sorted unique ranks                                           | ndarray/array
+
+    Return: number of ranks that were not seen before                   | #
+    """
+    if np is not None:
+        new = len(layer) - int(np.count_nonzero(visited[layer]))
+        visited[layer] = True
+        return new
+    new = 0
+    for rank in layer:
+        if not visited[rank]:
+            visited[rank] = 1
+            new += 1
+    return new
+
+
+def _contains(layer, rank) -> bool:
+    """
+    Binary search for a rank in a sorted layer
+    """
+    if np is not None:
+        i = int(np.searchsorted(layer, rank))
+    else:
+        i = bisect_left(layer, rank)
+    return i < len(layer) and layer[i] == rank
+
+
+def _moved_states(indexer, moves, rank, movers):
+    """
+    Ranks reached from a state by moving one knight of a color
+    Arg1: indexer of the puzzle                                         | StateIndexer
+    Arg2: knight move table of the board size                           | tuple
+    Arg3: rank of the state                                             | #
+    Arg4: "W" or "B", the color whose knight moves                      | char
+
+    Return: ranks after each legal move, turn flipped                   | list[#]
+    """
+    cols = indexer.cols
+    white, black, turn = indexer.unrank(int(rank))
+    next_turn = "B" if turn == "W" else "W"
+    occupied = set(white)
+    occupied.update(black)
+    moving, other = (white, black) if movers == "W" else (black, white)
+    ranks = []
+    for i, square in enumerate(moving):
+        for _, (row, col) in moves[square]:
+            dest = row * cols + col
+            if dest in occupied:
+                continue
+            moved = moving[:i] + [dest] + moving[i + 1 :]
+            if movers == "W":
+                ranks.append(indexer.rank_state(moved, other, next_turn))
+            else:
+                ranks.append(indexer.rank_state(other, moved, next_turn))
+    return ranks
+
+
+def layered_bfs(
+    start_state: Node, goal_state: Node, window=2, max_depth=None, precheck=True
+):
+    """
+    Layered Breadth-First Search with delayed duplicate detection
+    Goal test covers the side to move like a_star_search()
+    Every move flips the side to move, so layers d and d + 1 never share a state
+    and a child of layer d can only repeat a state of layer d - 1, d - 3, ...
+    The side that just moved can usually be undone in three moves (the other side
+    steps away, the move is reversed, the other side steps back), so a repeat
+    further back than d - 3 needs a stuck position and is rare.
+    Such repeats can keep a goal that can't be reached cycling forever, so with
+    a bounded window every state seen is flagged in a one byte per state map.
+    A layer holding only states seen before can only lead to states seen before,
+    so the search stops there.
+    Arg1: start node                                                          | Node
+    Arg2: destination node                                                    | Node
+    Arg3: earlier same-parity layers a new layer is checked against, 2 means
+        the parent's layer d - 1 and d - 3, None for all of them              | #
+    Arg4: deepest layer to build, None for no limit                           | #
+    Arg5: run feasibility.infeasibility_reason() first and skip the search
+        on puzzles it proves unsolvable                                       | Bool
+
+    Return: shortest path, expanded/generated counts                          | SearchResult
+        stats["layer_sizes"] lists the states stored per depth
+        stats["infeasible"] holds the reason when the precheck ruled it out
+    """
+    start_board = start_state.board
+    goal_board = goal_state.board
+    reason = infeasibility_reason(start_board, goal_board) if precheck else None
+    if reason is not None:
+        return SearchResult(None, 0, 0, {"layer_sizes": [], "infeasible": reason})
+    indexer = StateIndexer(
+        start_board.rows,
+        start_board.cols,
+        len(start_board.white_knight_pos_list),
+        len(start_board.black_knight_pos_list),
+    )
+    moves = knight_move_table(start_board.rows, start_board.cols)
+    goal_rank = indexer.rank(goal_board)
+    layers = [_unique([indexer.rank(start_board)])]
+    expanded = 0
+    generated = 0
+    found = _contains(layers[0], goal_rank)
+    visited = None
+    if window is not None:
+        if np is None:
+            visited = bytearray(indexer.size)
+        else:
+            visited = np.zeros(indexer.size, dtype=bool)
+        _mark_seen(visited, layers[0])
+    new_states = len(layers[0])
+    while (
+        not found
+        and new_states
+        and (max_depth is None or len(layers) <= max_depth)
+    ):
+        children = []
+        for rank in layers[-1]:
+            expanded += 1
+            movers = "B" if rank & 1 else "W"
+            children.extend(_moved_states(indexer, moves, rank, movers))
+        generated += len(children)
+        layer = _unique(children)
+        # same parity as the new layer: d - 1, d - 3, ... counting from the old top
+        previous = layers[-2::-2]
+        if window is not None:
+            previous = previous[:window]
+        for seen in previous:
+            layer = _remove_seen(layer, seen)
+        layers.append(layer)
+        found = _contains(layer, goal_rank)
+        new_states = len(layer) if visited is None else _mark_seen(visited, layer)
+    stats = {"layer_sizes": [len(layer) for layer in layers]}
+    if not found:
+        return SearchResult(None, expanded, generated, stats)
+    # backward sweep: a predecessor of each state is somewhere in the layer before it
+    ranks = [goal_rank]
+    for depth in range(len(layers) - 2, -1, -1):
+        movers = "W" if ranks[-1] & 1 else "B"
+        for previous_rank in _moved_states(indexer, moves, ranks[-1], movers):
+            if _contains(layers[depth], previous_rank):
+                ranks.append(previous_rank)
+                break
+    ranks.reverse()
+    path = []
+    for g_score, rank in enumerate(ranks):
+        white, black, turn = indexer.unrank(rank)
+        board = BitBoard(
+            indexer.rows,
+            indexer.cols,
+            [divmod(square, indexer.cols) for square in white],
+            [divmod(square, indexer.cols) for square in black],
+            turn,
+        )
+        if isinstance(start_board, ChessBoard):
+            board = ChessBoard(board.board_state, board.current_turn)
+        path.append(Node(board, g_score, 0, path[-1] if path else None))
+    return SearchResult(path, expanded, generated, stats)
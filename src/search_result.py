@@ -0,0 +1,39 @@
+"""
+Result object returned by the search engines.
+"""
+
+
+class SearchResult:
+    """
+    Stores the outcome of a search along with its counters
+    Attributes:
+        path (list[Node]): Nodes from the start to the goal, None if no path was found
+        expanded (int): Number of nodes taken off the open list and expanded
+        generated (int): Number of child nodes created during the search
+        stats (dict): Extra solver specific figures
+    Properties:
+        found: if a path was found
+        cost: number of moves on the path, None if no path was found
+    """
+
+    def __init__(self, path=None, expanded=0, generated=0, stats=None):
+        self.path = path
+        self.expanded = expanded
+        self.generated = generated
+        self.stats = {} if stats is None else stats
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    @property
+    def cost(self):
+        if self.path is None:
+            return None
+        return len(self.path) - 1
+
+    def __repr__(self):
+        return (
+            f"SearchResult(cost={self.cost}, expanded={self.expanded}, "
+            f"generated={self.generated})"
+        )
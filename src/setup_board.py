@@ -1,117 +1,126 @@
 import random
 from node import Node
 from chess_board import ChessBoard
+from bit_board import BitBoard
 
+# choice -> (rows, cols, knights per side), white starts on the bottom row,
+# black on the top row, and the goal swaps them
+BOARD_LAYOUTS = {
+    1: (3, 3, 2),
+    2: (4, 4, 2),
+    3: (5, 5, 2),
+    5: (8, 8, 4),
+}
+# choice -> (rows, cols, knights per side) of procedurally generated boards
+RANDOM_LAYOUTS = {
+    4: (5, 5, 2),
+    6: (8, 8, 4),
+}
 
-def setup_board(board_choice: int):
-    if board_choice == 1:
-        start_board = [["B", ".", "B"], [".", ".", "."], ["W", ".", "W"]]
-        start_white_pos = [[2, 0], [2, 2]]
-        start_black_pos = [[0, 0], [0, 2]]
-        start_state = Node(
-            current_board=ChessBoard(start_board, "W", start_white_pos, start_black_pos)
-        )
-        goal_board = [["W", ".", "W"], [".", ".", "."], ["B", ".", "B"]]
-        goal_white_pos = [[0, 0], [0, 2]]
-        goal_black_pos = [[2, 0], [2, 2]]
-        goal_state = Node(
-            current_board=ChessBoard(goal_board, "W", goal_white_pos, goal_black_pos)
-        )
-    elif board_choice == 2:
-        start_board = [
-            ["B", ".", ".", "B"],
-            [".", ".", ".", "."],
-            [".", ".", ".", "."],
-            ["W", ".", ".", "W"],
-        ]
-        start_white_pos = [[3, 0], [3, 3]]
-        start_black_pos = [[0, 0], [0, 3]]
-        start_state = Node(
-            current_board=ChessBoard(start_board, "W", start_white_pos, start_black_pos)
-        )
-        goal_board = [
-            ["W", ".", ".", "W"],
-            [".", ".", ".", "."],
-            [".", ".", ".", "."],
-            ["B", ".", ".", "B"],
-        ]
-        goal_white_pos = [[0, 0], [0, 3]]
-        goal_black_pos = [[3, 0], [3, 3]]
-        goal_state = Node(
-            current_board=ChessBoard(goal_board, "W", goal_white_pos, goal_black_pos)
-        )
-    elif board_choice == 3:
-        start_board = [
-            ["B", ".", ".", ".", "B"],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            ["W", ".", ".", ".", "W"],
-        ]
-        start_white_pos = [[4, 0], [4, 4]]
-        start_black_pos = [[0, 0], [0, 4]]
-        start_state = Node(
-            current_board=ChessBoard(start_board, "W", start_white_pos, start_black_pos)
-        )
-        goal_board = [
-            ["W", ".", ".", ".", "W"],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            ["B", ".", ".", ".", "B"],
-        ]
-        goal_white_pos = [[0, 0], [0, 4]]
-        goal_black_pos = [[4, 0], [4, 4]]
-        goal_state = Node(
-            current_board=ChessBoard(goal_board, "W", goal_white_pos, goal_black_pos)
-        )
-    if board_choice == 4:
-        # procedurally generate knight placement on a 5x5 board
-        start_board = [
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-        ]
-        goal_board = [
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-            [".", ".", ".", ".", "."],
-        ]
 
-        start_white_pos = []
-        start_black_pos = []
-        for i in range(0, 4):
-            new_position = [random.randint(0, 4), random.randint(0, 4)]
-            while new_position in start_white_pos or new_position in start_black_pos:
-                new_position = [random.randint(0, 4), random.randint(0, 4)]
-            if i < 2:
-                start_white_pos.append(new_position)
-            else:
-                start_black_pos.append(new_position)
+def edge_columns(cols: int, knights: int):
+    """
+    Columns of a back row filled from both corners inwards
+    Arg1: number of columns on the board                                | #
+    Arg2: number of knights on the row                                  | #
+
+    Return: column indexes, corners first                               | list[#]
+    """
+    if knights > cols:
+        raise ValueError(f"{knights} knights do not fit on a row of {cols}")
+    columns = []
+    left, right = 0, cols - 1
+    while len(columns) < knights:
+        columns.append(left)
+        if len(columns) < knights:
+            columns.append(right)
+        left += 1
+        right -= 1
+    return columns
+
+
+def make_puzzle(
+    rows,
+    cols,
+    start_white_pos,
+    start_black_pos,
+    goal_white_pos=None,
+    goal_black_pos=None,
+    current_turn="W",
+    compact=False,
+):
+    """
+    Builds start and goal nodes for any board size, knight count and layout
+    Arg1: number of rows on the board                                   | #
+    Arg2: number of columns on the board                                | #
+    Arg3: white knights at the start                                    | [[#,#]]
+    Arg4: black knights at the start                                    | [[#,#]]
+    Arg5: white knights in the goal, None for the black start squares   | [[#,#]]
+    Arg6: black knights in the goal, None for the white start squares   | [[#,#]]
+    Arg7: side to move at the start and in the goal                     | char
+    Arg8: use BitBoard instead of the list based ChessBoard             | Bool
+
+    Return: start and goal nodes                                        | Node, Node
+    """
+    if goal_white_pos is None:
         goal_white_pos = start_black_pos
+    if goal_black_pos is None:
         goal_black_pos = start_white_pos
+    states = []
+    for white_pos, black_pos in (
+        (start_white_pos, start_black_pos),
+        (goal_white_pos, goal_black_pos),
+    ):
+        white_pos = [list(pos) for pos in white_pos]
+        black_pos = [list(pos) for pos in black_pos]
+        if compact:
+            board = BitBoard(rows, cols, white_pos, black_pos, current_turn)
+        else:
+            board_state = [["."] * cols for _ in range(rows)]
+            for row, col in white_pos:
+                board_state[row][col] = "W"
+            for row, col in black_pos:
+                board_state[row][col] = "B"
+            board = ChessBoard(board_state, current_turn, white_pos, black_pos)
+        states.append(Node(current_board=board))
+    return states[0], states[1]
+
+
+def random_puzzle(rows, cols, knights, compact=False, rng=None):
+    """
+    Random start layout with the colors swapped in the goal
+    Arg1: number of rows on the board                                   | #
+    Arg2: number of columns on the board                                | #
+    Arg3: knights per side                                              | #
+    Arg4: use BitBoard instead of the list based ChessBoard             | Bool
+    Arg5: random source, a seeded random.Random for reproducible boards | random.Random
 
-        # setup start board
-        for pos in start_white_pos:
-            start_board[pos[0]][pos[1]] = "W"
-        for pos in start_black_pos:
-            start_board[pos[0]][pos[1]] = "B"
+    Return: start and goal nodes                                        | Node, Node
+    """
+    if rng is None:
+        rng = random
+    start_white_pos = []
+    start_black_pos = []
+    for i in range(0, 2 * knights):
+        new_position = [rng.randint(0, rows - 1), rng.randint(0, cols - 1)]
+        while new_position in start_white_pos or new_position in start_black_pos:
+            new_position = [rng.randint(0, rows - 1), rng.randint(0, cols - 1)]
+        if i < knights:
+            start_white_pos.append(new_position)
+        else:
+            start_black_pos.append(new_position)
+    return make_puzzle(rows, cols, start_white_pos, start_black_pos, compact=compact)
 
-        # setup goal board
-        for pos in goal_white_pos:
-            goal_board[pos[0]][pos[1]] = "W"
-        for pos in goal_black_pos:
-            goal_board[pos[0]][pos[1]] = "B"
 
-        # create state objects
-        start_state = Node(
-            current_board=ChessBoard(start_board, "W", start_white_pos, start_black_pos)
-        )
-        goal_state = Node(
-            current_board=ChessBoard(goal_board, "W", goal_white_pos, goal_black_pos)
-        )
-    return start_state, goal_state
+def setup_board(board_choice: int, compact: bool = False, rng=None):
+    # rng lets callers pass a seeded random.Random for reproducible random boards
+    if board_choice in RANDOM_LAYOUTS:
+        rows, cols, knights = RANDOM_LAYOUTS[board_choice]
+        return random_puzzle(rows, cols, knights, compact, rng)
+    if board_choice not in BOARD_LAYOUTS:
+        raise ValueError(f"Unknown board choice: {board_choice}")
+    rows, cols, knights = BOARD_LAYOUTS[board_choice]
+    columns = edge_columns(cols, knights)
+    start_white_pos = [[rows - 1, col] for col in columns]
+    start_black_pos = [[0, col] for col in columns]
+    return make_puzzle(rows, cols, start_white_pos, start_black_pos, compact=compact)
@@ -0,0 +1,115 @@
+"""
+Lightweight result of a solve: the start board plus the moves, not a node chain.
+A found path is turned into (from, to) square pairs as soon as the search returns,
+so no Node or intermediate board outlives the search. Boards are rebuilt one at
+a time from the start board when they are asked for.
+"""
+
+from search_result import SearchResult
+
+
+def move_between(board, next_board):
+    """
+    Knight move that turns one board into the next
+    Read off the state keys, so it works on ChessBoard and BitBoard alike
+    Arg1: board before the move                                         | ChessBoard/BitBoard
+    Arg2: board after the move                                          | ChessBoard/BitBoard
+
+    Return: (from, to) coordinate positions                             | tuple
+    """
+    squares = board.rows * board.cols
+    square_bits = (1 << squares) - 1
+    before = board.state_key
+    after = next_board.state_key
+    if not (before ^ after) & square_bits:
+        # white did not move, look at the black squares
+        before >>= squares
+        after >>= squares
+    before &= square_bits
+    after &= square_bits
+    source = (before & ~after).bit_length() - 1
+    dest = (after & ~before).bit_length() - 1
+    return divmod(source, board.cols), divmod(dest, board.cols)
+
+
+class Solution:
+    """
+    Moves, cost and counters of a search, without the nodes
+    Attributes:
+        start_board (ChessBoard/BitBoard): Board the moves start from
+        moves (tuple): (from, to) coordinate pairs, None if no path was found
+        expanded (int): Number of nodes expanded, None if the solver doesn't count
+        generated (int): Number of nodes generated, None if the solver doesn't count
+        stats (dict): Extra solver specific figures
+    Properties:
+        found: if a path was found
+        cost: number of moves, None if no path was found
+    Methods:
+        from_result(start_board, result)
+        boards()
+        print_boards()
+    """
+
+    __slots__ = ("start_board", "moves", "expanded", "generated", "stats")
+
+    def __init__(self, start_board, moves=None, expanded=0, generated=0, stats=None):
+        self.start_board = start_board
+        self.moves = None if moves is None else tuple(moves)
+        self.expanded = expanded
+        self.generated = generated
+        self.stats = {} if stats is None else stats
+
+    @classmethod
+    def from_result(cls, start_board, result: SearchResult):
+        """
+        Converts a SearchResult, dropping its node chain
+        Arg1: start board of the search                                 | ChessBoard/BitBoard
+        Arg2: result of a solver                                        | SearchResult
+
+        Return: the same outcome as moves                               | Solution
+        """
+        moves = None
+        if result.path is not None:
+            boards = [node.board for node in result.path]
+            moves = [move_between(a, b) for a, b in zip(boards, boards[1:])]
+        return cls(start_board, moves, result.expanded, result.generated, result.stats)
+
+    @property
+    def found(self):
+        return self.moves is not None
+
+    @property
+    def cost(self):
+        if self.moves is None:
+            return None
+        return len(self.moves)
+
+    def boards(self):
+        """
+        Streams the boards from start to goal by replaying the moves
+        Only the board being yielded and the next one are alive at a time
+
+        Return: generator of boards, nothing if no path was found       | ChessBoard/BitBoard
+        """
+        if self.moves is None:
+            return
+        board = self.start_board
+        yield board
+        for pos, dest in self.moves:
+            board = board.make_move(pos, dest)
+            yield board
+
+    def print_boards(self):
+        """
+        Prints every board of the path with print_board()
+
+        Return: Nothing
+        """
+        for board in self.boards():
+            board.print_board()
+
+    def __repr__(self):
+        return (
+            f"Solution(cost={self.cost}, expanded={self.expanded}, "
+            f"generated={self.generated})"
+        )
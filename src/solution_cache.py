@@ -0,0 +1,221 @@
+"""
+Cache of solved puzzles keyed by their normalized (start, goal) state keys.
+Pairs are normalized with symmetry.canonical_pair(), so a rotated, mirrored or
+color swapped copy of a puzzle that was already solved is a hit. Each path is stored
+as the normalized state keys from start to goal. Every state on an optimal path
+also gets an entry holding the rest of the path, so a later puzzle starting from
+any of those states with the same goal is answered without a search.
+
+Only paths of optimal solvers returning a SearchResult are stored, built from the
+boards the search actually reached, since every suffix is reused as an exact answer.
+
+Entries live in an LRU dict in memory and, when a file is given, in a shelve
+file that persists between runs, such as DEFAULT_CACHE_FILE in the user's cache
+directory.
+"""
+
+import os
+import shelve
+import weakref
+from collections import OrderedDict
+from a_star import a_star_search
+from bit_board import BitBoard
+from chess_board import ChessBoard
+from node import Node
+from search_result import SearchResult
+from symmetry import canonical_pair
+
+# per-user cache, for callers that ask for a persistent store
+DEFAULT_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "four_knights",
+    "solution_cache",
+)
+
+
+class SolutionCache:
+    """
+    LRU cache of optimal paths with an optional on-disk store
+    Only store the results of solvers that return optimal paths, the suffixes
+    are only shortest paths when the whole path is
+    Arg1: entries kept in memory                                        | #
+    Arg2: shelve file for the on-disk store, None to keep it in memory  | str
+    Attributes:
+        hits (int): Lookups answered from a stored start
+        suffix_hits (int): Lookups answered from the rest of a stored path
+        disk_hits (int): Of the hits, those read from the on-disk store
+        misses (int): Lookups with no entry
+    Methods:
+        lookup(start_board, goal_board, namespace)
+        store(start_board, goal_board, path, namespace)
+        solve(start_state, goal_state, solver, namespace)
+        close()
+    """
+
+    def __init__(self, capacity=4096, path=None):
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.suffix_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.shelf = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.shelf = shelve.open(path)
+        # flushes the on-disk store even if close() is never called
+        self._finalizer = weakref.finalize(self, SolutionCache._cleanup, self.shelf)
+
+    @property
+    def stats(self):
+        """
+        Counters as a dict, for SearchResult.stats or printing
+        """
+        lookups = self.hits + self.suffix_hits + self.misses
+        return {
+            "hits": self.hits,
+            "suffix_hits": self.suffix_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.suffix_hits) / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _entry_key(board, pair, namespace):
+        """
+        Key of an entry, the state keys only make sense for one board size
+        """
+        return f"{namespace}:{board.rows}x{board.cols}:{pair[0]}:{pair[1]}"
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def lookup(self, start_board, goal_board, namespace="a_star"):
+        """
+        Cached path for a puzzle
+        Arg1: start board                                               | ChessBoard/BitBoard
+        Arg2: goal board                                                | ChessBoard/BitBoard
+        Arg3: name of the solver the entries came from                  | str
+
+        Return: (hit, path) where path is None when the goal is known
+            to be unreachable, and (False, None) on a miss              | tuple
+        """
+        pair, symmetry = canonical_pair(start_board, goal_board)
+        key = self._entry_key(start_board, pair, namespace)
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        elif self.shelf is not None and key in self.shelf:
+            value = self.shelf[key]
+            self.disk_hits += 1
+            self._remember(key, value)
+        if value is None:
+            self.misses += 1
+            return False, None
+        from_suffix, state_keys = value
+        if from_suffix:
+            self.suffix_hits += 1
+        else:
+            self.hits += 1
+        if state_keys is None:
+            return True, None
+        # state keys are normalized, map them back onto the caller's board
+        inverse = symmetry.inverse()
+        path = []
+        for g_score, state_key in enumerate(state_keys):
+            board = inverse.apply(
+                BitBoard.from_state_key(start_board.rows, start_board.cols, state_key)
+            )
+            if isinstance(start_board, ChessBoard):
+                board = ChessBoard(board.board_state, board.current_turn)
+            path.append(Node(board, g_score, 0, path[-1] if path else None))
+        return True, path
+
+    def store(self, start_board, goal_board, path, namespace="a_star"):
+        """
+        Stores an optimal path and every suffix of it
+        Arg1: start board                                               | ChessBoard/BitBoard
+        Arg2: goal board                                                | ChessBoard/BitBoard
+        Arg3: nodes from start to goal, None if the goal is unreachable | list[Node]
+        Arg4: name of the solver the path came from                     | str
+
+        Return: Nothing
+        """
+        if path is not None and (
+            path[0].board != start_board or path[-1].board != goal_board
+        ):
+            # the keys must be the boards reached, side to move included
+            raise ValueError("path does not run from the start board to the goal board")
+        if path is None:
+            pair, _ = canonical_pair(start_board, goal_board)
+            self._put(self._entry_key(start_board, pair, namespace), (False, None))
+            return
+        for i, node in enumerate(path):
+            pair, symmetry = canonical_pair(node.board, goal_board)
+            key = self._entry_key(start_board, pair, namespace)
+            value = (
+                i > 0,
+                tuple(symmetry.apply_key(later.board.state_key) for later in path[i:]),
+            )
+            existing = self.entries.get(key)
+            if existing is not None and not existing[0] and i > 0:
+                continue  # keep the entry a puzzle was actually solved from
+            self._put(key, value)
+
+    def _put(self, key, value):
+        self._remember(key, value)
+        if self.shelf is not None:
+            self.shelf[key] = value
+
+    def solve(self, start_state: Node, goal_state: Node, solver=a_star_search, namespace=None):
+        """
+        Cached run of a solver
+        Arg1: start node                                                | Node
+        Arg2: destination node                                          | Node
+        Arg3: optimal solver returning a SearchResult, with a goal test
+            that covers the side to move like a_star_search()           | Callable
+        Arg4: name the entries are filed under, the solver's name if None | str
+
+        Return: path and counters, stats["cache"] is "hit" or "miss"    | SearchResult
+        """
+        if namespace is None:
+            namespace = solver.__name__
+        start_board = start_state.board
+        goal_board = goal_state.board
+        hit, path = self.lookup(start_board, goal_board, namespace)
+        if hit:
+            return SearchResult(path, 0, 0, {"cache": "hit"})
+        result = solver(start_state, goal_state)
+        if not isinstance(result, SearchResult):
+            raise TypeError(
+                f"{namespace} doesn't return a SearchResult, only optimal "
+                "SearchResult solvers can be cached"
+            )
+        # a search stopped by a budget proves nothing about reachability
+        if result.path is not None or not result.stats.get("budget_exhausted"):
+            self.store(start_board, goal_board, result.path, namespace)
+        result.stats["cache"] = "miss"
+        return result
+
+    def close(self):
+        """
+        Writes out and closes the on-disk store
+
+        Return: Nothing
+        """
+        self._finalizer()
+        self.shelf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _cleanup(shelf):
+        if shelf is not None:
+            shelf.close()
@@ -0,0 +1,98 @@
+"""
+Registry of the search engines by name.
+Every entry is called as solver(start_state, goal_state) and returns a SearchResult,
+so batch runs and benchmarks can treat them all the same way.
+"""
+
+from a_star import a_star, a_star_search
+from anytime import anytime_a_star
+from batch_expansion import batch_a_star
+from bidirectional import bidirectional_search
+from branch_and_bound import bnb, bnb_bounded
+from hda_star import hda_star
+from ida_star import ida_star
+from instrumentation import ProgressReporter
+from layered_bfs import layered_bfs
+from node import Node
+from search_result import SearchResult
+from solution import Solution
+from state_space import state_space_solve
+
+
+def _legacy(solver):
+    """
+    Wraps a solver that returns a node list or "no path found"
+    The legacy solvers do not count nodes so expanded/generated are None
+    Arg1: legacy solver, keyword options are passed through             | Callable
+
+    Return: solver returning a SearchResult                             | Callable
+    """
+
+    def run(start_state, goal_state, **options):
+        path = solver(start_state, goal_state, **options)
+        if isinstance(path, str):
+            path = None
+        return SearchResult(path, None, None)
+
+    run.__name__ = solver.__name__
+    return run
+
+
+SOLVERS = {
+    "a_star": a_star_search,
+    "a_star_batched": batch_a_star,
+    "a_star_legacy": _legacy(a_star),
+    "anytime": anytime_a_star,
+    "bnb": _legacy(bnb),
+    "bnb_bounded": bnb_bounded,
+    "bidirectional": bidirectional_search,
+    "hda_star": hda_star,
+    "ida_star": ida_star,
+    "layered_bfs": layered_bfs,
+    "state_space": state_space_solve,
+}
+
+# solvers that start worker processes of their own, so they can't run inside a
+# process pool worker (pool workers are daemonic and may not have children)
+PROCESS_SOLVERS = frozenset(("hda_star",))
+
+# original solvers kept for comparison, they return plain node lists and are slow
+LEGACY_SOLVERS = frozenset(("a_star_legacy", "bnb"))
+
+# solvers benchmarks run when none are named
+DEFAULT_SOLVERS = tuple(sorted(set(SOLVERS) - PROCESS_SOLVERS - LEGACY_SOLVERS))
+
+# solvers taking an observer, so they can report progress
+OBSERVABLE = frozenset(("a_star", "a_star_legacy", "bnb", "bnb_bounded"))
+
+
+def solve(
+    start_state: Node,
+    goal_state: Node,
+    solver="a_star",
+    progress=None,
+    progress_interval=1000,
+    **options,
+):
+    """
+    Library entry point, runs a registered solver and keeps only the moves
+    The node chain is dropped before returning, boards are rebuilt on demand
+    with Solution.boards()
+    Arg1: start node                                                    | Node
+    Arg2: destination node                                              | Node
+    Arg3: name of a solver from SOLVERS                                 | str
+    Arg4: function called with a progress dict, see
+        instrumentation.ProgressReporter. Needs a solver in OBSERVABLE  | Callable
+    Arg5: expansions between progress calls                             | #
+    Arg*: keyword options passed on to the solver
+
+    Return: moves, cost and counters                                    | Solution
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    if progress is not None:
+        if solver not in OBSERVABLE:
+            raise ValueError(f"{solver} can't report progress")
+        options["observer"] = ProgressReporter(progress, progress_interval)
+    result = SOLVERS[solver](start_state, goal_state, **options)
+    return Solution.from_result(start_state.board, result)
@@ -0,0 +1,157 @@
+"""
+Ranking helpers that turn sets of squares into dense array indexes.
+Knights of one color are interchangeable, so a color's placement is a combination
+of squares and is ranked with the combinatorial number system.
+"""
+
+from math import comb
+
+_binomials: dict = {}
+
+
+def binomial_table(squares: int, pieces: int):
+    """
+    Binomial coefficients C(n, k) for n <= squares and k <= pieces
+    Built once per size so ranking is only table lookups
+    Arg1: number of squares on the board                               | #
+    Arg2: most pieces that will be ranked together                     | #
+
+    Return: table[n][k]                                                | tuple[tuple]
+    """
+    table = _binomials.get((squares, pieces))
+    if table is None:
+        table = tuple(
+            tuple(comb(n, k) for k in range(pieces + 1)) for n in range(squares + 1)
+        )
+        _binomials[(squares, pieces)] = table
+    return table
+
+
+def rank_squares(square_list, binomials) -> int:
+    """
+    Dense index of a set of squares
+    Arg1: square indexes, any order                                    | [#]
+    Arg2: binomial table from binomial_table()                         | tuple[tuple]
+
+    Return: index in [0, C(squares, len(square_list)))                 | #
+    """
+    rank = 0
+    for i, square in enumerate(sorted(square_list)):
+        rank += binomials[square][i + 1]
+    return rank
+
+
+def unrank_squares(rank: int, pieces: int, squares: int, binomials):
+    """
+    Set of squares for a dense index, inverse of rank_squares()
+    Arg1: index to decode                                              | #
+    Arg2: number of squares in the set                                 | #
+    Arg3: number of squares on the board                               | #
+    Arg4: binomial table from binomial_table()                         | tuple[tuple]
+
+    Return: square indexes in ascending order                          | list[#]
+    """
+    square_list = []
+    square = squares - 1
+    for i in range(pieces, 0, -1):
+        while binomials[square][i] > rank:
+            square -= 1
+        square_list.append(square)
+        rank -= binomials[square][i]
+        square -= 1
+    square_list.reverse()
+    return square_list
+
+
+def board_squares(pos_list, cols: int):
+    """
+    Square indexes of a list of coordinate positions
+    Arg1: coordinate positions                                         | [[#,#]]
+    Arg2: number of columns on the board                               | #
+
+    Return: square indexes                                             | list[#]
+    """
+    return [row * cols + col for row, col in pos_list]
+
+
+class StateIndexer:
+    """
+    Dense index for whole board states
+    White knights are ranked over every square, black knights over the squares
+    white leaves free, then the side to move is the lowest digit.
+    Index range is C(n, white) * C(n - white, black) * 2 with no gaps.
+    Attributes:
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+        white_count (int): Number of white knights
+        black_count (int): Number of black knights
+        size (int): Number of indexes
+    Methods:
+        rank(board)
+        rank_state(white_squares, black_squares, current_turn)
+        unrank(index)
+    """
+
+    def __init__(self, rows, cols, white_count, black_count):
+        self.rows = rows
+        self.cols = cols
+        self.white_count = white_count
+        self.black_count = black_count
+        squares = rows * cols
+        self._binomials = binomial_table(squares, max(white_count, black_count))
+        self._black_ranks = self._binomials[squares - white_count][black_count]
+        self.size = self._binomials[squares][white_count] * self._black_ranks * 2
+
+    def rank(self, board) -> int:
+        """
+        Index of a board
+        Arg1: board to index                                            | ChessBoard/BitBoard
+
+        Return: index in [0, size)                                      | #
+        """
+        return self.rank_state(
+            board_squares(board.white_knight_pos_list, self.cols),
+            board_squares(board.black_knight_pos_list, self.cols),
+            board.current_turn,
+        )
+
+    def rank_state(self, white_squares, black_squares, current_turn) -> int:
+        """
+        Index of a state given as square indexes, no board needed
+        Arg1: white knight square indexes, any order                    | [#]
+        Arg2: black knight square indexes, any order                    | [#]
+        Arg3: whoever moves next                                        | char
+
+        Return: index in [0, size)                                      | #
+        """
+        white = sorted(white_squares)
+        black = []
+        for square in black_squares:
+            below = 0
+            for white_square in white:
+                if white_square < square:
+                    below += 1
+            black.append(square - below)
+        rank = rank_squares(white, self._binomials) * self._black_ranks
+        rank += rank_squares(black, self._binomials)
+        return rank * 2 + (current_turn == "B")
+
+    def unrank(self, index: int):
+        """
+        Knight squares and side to move of an index, inverse of rank()
+        Arg1: index to decode                                           | #
+
+        Return: white squares, black squares, side to move              | list, list, char
+        """
+        squares = self.rows * self.cols
+        rank, black_next = divmod(index, 2)
+        white_rank, black_rank = divmod(rank, self._black_ranks)
+        white = unrank_squares(white_rank, self.white_count, squares, self._binomials)
+        free = [square for square in range(squares) if square not in white]
+        black = [
+            free[square]
+            for square in unrank_squares(
+                black_rank, self.black_count, squares - self.white_count, self._binomials
+            )
+        ]
+        return white, black, "B" if black_next else "W"
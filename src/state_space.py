@@ -0,0 +1,156 @@
+"""
+Whole state space solver for boards small enough to enumerate.
+One reverse breadth-first search from the goal stores the distance to the goal of
+every reachable state in a byte array indexed by StateIndexer. Any start is then
+solved by greedy descent: step to a child one move closer until the goal is reached,
+which costs O(path length * branching factor) per query.
+"""
+
+import os
+from collections import OrderedDict
+from bit_board import BitBoard
+from node import Node
+from search_result import SearchResult
+from state_index import StateIndexer
+
+UNREACHABLE = 255
+
+_solvers: OrderedDict = OrderedDict()
+
+
+class StateSpaceSolver:
+    """
+    Distance to goal for every state of a board size and knight count
+    Attributes:
+        goal_board (ChessBoard/BitBoard): Goal the table was built for
+        indexer (StateIndexer): Maps boards to table indexes
+        table (bytearray): Distance per index, UNREACHABLE if the goal can't be reached
+        reachable (int): Number of states that can reach the goal
+    Methods:
+        distance(board)
+        solve(start_state)
+    """
+
+    def __init__(self, goal_board, match_turn=True, cache_dir=None):
+        if not isinstance(goal_board, BitBoard):
+            goal_board = BitBoard.from_chess_board(goal_board)
+        self.goal_board = goal_board
+        self.indexer = StateIndexer(
+            goal_board.rows,
+            goal_board.cols,
+            len(goal_board.white_knight_pos_list),
+            len(goal_board.black_knight_pos_list),
+        )
+        goal_turns = [goal_board.current_turn] if match_turn else ["W", "B"]
+        path = None
+        self.table = None
+        if cache_dir is not None:
+            path = os.path.join(
+                cache_dir,
+                f"states_{goal_board.rows}x{goal_board.cols}_"
+                f"{self.indexer.rank(goal_board)}_{''.join(goal_turns)}.bin",
+            )
+            if os.path.exists(path) and os.path.getsize(path) == self.indexer.size:
+                with open(path, "rb") as table_file:
+                    self.table = bytearray(table_file.read())
+        if self.table is None:
+            self.table = self._build(goal_turns)
+            if path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as table_file:
+                    table_file.write(self.table)
+                os.replace(temp_path, path)
+        self.reachable = len(self.table) - self.table.count(UNREACHABLE)
+
+    def _build(self, goal_turns):
+        """
+        Reverse breadth-first search from the goal states
+
+        Return: distance per index                                     | bytearray
+        """
+        table = bytearray([UNREACHABLE]) * self.indexer.size
+        layer = []
+        for turn in goal_turns:
+            goal_node = Node(
+                BitBoard(
+                    self.goal_board.rows,
+                    self.goal_board.cols,
+                    self.goal_board.white_knight_pos_list,
+                    self.goal_board.black_knight_pos_list,
+                    turn,
+                )
+            )
+            table[self.indexer.rank(goal_node.board)] = 0
+            layer.append(goal_node)
+        depth = 0
+        while layer:
+            depth += 1
+            if depth >= UNREACHABLE:
+                raise ValueError("Distances do not fit in one byte per state")
+            next_layer = []
+            for node in layer:
+                for previous in node.iter_predecessors():
+                    index = self.indexer.rank(previous.board)
+                    if table[index] == UNREACHABLE:
+                        table[index] = depth
+                        # drop the parent link, only the board is needed
+                        next_layer.append(Node(previous.board))
+            layer = next_layer
+        return table
+
+    def distance(self, board):
+        """
+        Moves left to the goal from a board
+        Arg1: board to look up                                          | ChessBoard/BitBoard
+
+        Return: distance to the goal, None if the goal can't be reached | #
+        """
+        distance = self.table[self.indexer.rank(board)]
+        if distance == UNREACHABLE:
+            return None
+        return distance
+
+    def solve(self, start_state: Node):
+        """
+        Walks down the distance table from a start node
+        Arg1: start node                                                | Node
+
+        Return: optimal path, expanded/generated counts                 | SearchResult
+        """
+        node = Node(start_state.board)
+        distance = self.distance(node.board)
+        if distance is None:
+            return SearchResult(None)
+        path = [node]
+        generated = 0
+        while distance > 0:
+            for child in node.iter_children():
+                generated += 1
+                if self.table[self.indexer.rank(child.board)] == distance - 1:
+                    break
+            node = child
+            distance -= 1
+            path.append(node)
+        return SearchResult(path, len(path) - 1, generated)
+
+
+def state_space_solve(start_state: Node, goal_state: Node, cache_size=8):
+    """
+    Solves with a StateSpaceSolver, reusing the table of a recently seen goal
+    Arg1: start node                                                    | Node
+    Arg2: destination node                                              | Node
+    Arg3: how many goals' tables to keep in memory                      | #
+
+    Return: optimal path, expanded/generated counts                     | SearchResult
+    """
+    key = goal_state.board.state_key
+    solver = _solvers.get(key)
+    if solver is None:
+        solver = StateSpaceSolver(goal_state.board)
+        _solvers[key] = solver
+        while len(_solvers) > cache_size:
+            _solvers.popitem(last=False)
+    else:
+        _solvers.move_to_end(key)
+    return solver.solve(start_state)
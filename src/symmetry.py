@@ -0,0 +1,260 @@
+"""
+Board symmetries used to merge equivalent states during search.
+A square board has 8 geometric symmetries (rotations and mirrors), a rectangular one
+has 4, and swapping the colors together with the side to move doubles that.
+Two states may only share a closed set entry when they are the same distance from
+the goal, so the searches use the symmetries that leave the goal unchanged.
+The whole group is still available for normalizing (start, goal) pairs, with
+map_path() to turn a path found on the normalized pair back into real coordinates.
+"""
+
+from bit_board import BitBoard
+from chess_board import ChessBoard
+from node import Node
+
+_board_symmetries: dict = {}
+
+
+def _geometric_transforms(rows: int, cols: int):
+    """
+    Coordinate maps of the rotations and mirrors that fit the board
+    Arg1: number of rows on the board                                  | #
+    Arg2: number of columns on the board                               | #
+
+    Return: list of (name, function mapping (row, col) to (row, col))  | list[tuple]
+    """
+    last_row = rows - 1
+    last_col = cols - 1
+    transforms = [
+        ("identity", lambda row, col: (row, col)),
+        ("flip_rows", lambda row, col: (last_row - row, col)),
+        ("flip_cols", lambda row, col: (row, last_col - col)),
+        ("rotate_180", lambda row, col: (last_row - row, last_col - col)),
+    ]
+    if rows == cols:
+        transforms += [
+            ("transpose", lambda row, col: (col, row)),
+            ("anti_transpose", lambda row, col: (last_col - col, last_row - row)),
+            ("rotate_90", lambda row, col: (col, last_row - row)),
+            ("rotate_270", lambda row, col: (last_col - col, row)),
+        ]
+    return transforms
+
+
+class Symmetry:
+    """
+    One symmetry of the board: a permutation of the squares, optionally with the
+    colors swapped (which also hands the move to the other side)
+    Attributes:
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+        name (str): Name of the geometric part, "+swap" added when colors swap
+        squares (tuple): Square index each square is sent to
+        swap_colors (bool): White and black knights trade places
+    Methods:
+        apply_key(state_key)
+        apply_pos(pos)
+        apply(board)
+        inverse()
+        map_path(path)
+    """
+
+    __slots__ = ("rows", "cols", "name", "squares", "swap_colors", "_bits")
+
+    def __init__(self, rows, cols, name, squares, swap_colors=False):
+        self.rows = rows
+        self.cols = cols
+        self.name = name
+        self.squares = tuple(squares)
+        self.swap_colors = swap_colors
+        self._bits = tuple(1 << square for square in self.squares)
+
+    def __repr__(self):
+        return f"Symmetry({self.name})"
+
+    def apply_key(self, state_key: int) -> int:
+        """
+        State key of the transformed board, without building the board
+        Arg1: packed state key                                          | #
+
+        Return: packed state key after the symmetry                     | #
+        """
+        squares = self.rows * self.cols
+        square_bits = (1 << squares) - 1
+        bits = self._bits
+        masks = []
+        for mask in (state_key & square_bits, (state_key >> squares) & square_bits):
+            moved = 0
+            while mask:
+                low = mask & -mask
+                moved |= bits[low.bit_length() - 1]
+                mask ^= low
+            masks.append(moved)
+        white, black = masks
+        black_next = state_key >> (2 * squares)
+        if self.swap_colors:
+            white, black = black, white
+            black_next ^= 1
+        return white | (black << squares) | (black_next << (2 * squares))
+
+    def apply_pos(self, pos):
+        """
+        Coordinate position a square is sent to
+        Arg1: coordinate position                                       | [#,#]
+
+        Return: coordinate position after the symmetry                  | (#,#)
+        """
+        return divmod(self.squares[pos[0] * self.cols + pos[1]], self.cols)
+
+    def apply(self, board):
+        """
+        Transformed copy of a board, of the same board type
+        Knight lists keep their order so paths stay comparable
+        Arg1: board to transform                                        | ChessBoard/BitBoard
+
+        Return: board after the symmetry                                | ChessBoard/BitBoard
+        """
+        white_pos = [self.apply_pos(pos) for pos in board.white_knight_pos_list]
+        black_pos = [self.apply_pos(pos) for pos in board.black_knight_pos_list]
+        turn = board.current_turn
+        if self.swap_colors:
+            white_pos, black_pos = black_pos, white_pos
+            turn = "B" if turn == "W" else "W"
+        if isinstance(board, BitBoard):
+            return BitBoard(self.rows, self.cols, white_pos, black_pos, turn)
+        board_state = [["."] * self.cols for _ in range(self.rows)]
+        for row, col in white_pos:
+            board_state[row][col] = "W"
+        for row, col in black_pos:
+            board_state[row][col] = "B"
+        return ChessBoard(
+            board_state,
+            turn,
+            [list(pos) for pos in white_pos],
+            [list(pos) for pos in black_pos],
+        )
+
+    def inverse(self):
+        """
+        Symmetry that undoes this one
+
+        Return: inverse symmetry                                        | Symmetry
+        """
+        squares = [0] * len(self.squares)
+        for square, image in enumerate(self.squares):
+            squares[image] = square
+        return Symmetry(self.rows, self.cols, f"{self.name}^-1", squares, self.swap_colors)
+
+    def map_path(self, path):
+        """
+        Transforms every board of a path, keeping g scores and parent links
+        Used with inverse() to bring a path found on a normalized board back
+        Arg1: nodes from start to goal                                  | list[Node]
+
+        Return: transformed nodes from start to goal                    | list[Node]
+        """
+        mapped = []
+        parent = None
+        for node in path:
+            parent = Node(self.apply(node.board), node.g_score, node.h_score, parent)
+            mapped.append(parent)
+        return mapped
+
+
+def board_symmetries(rows: int, cols: int, color_swap=True):
+    """
+    Every symmetry of a board size, identity first
+    Built once per size and shared
+    Arg1: number of rows on the board                                  | #
+    Arg2: number of columns on the board                               | #
+    Arg3: include the color swapped versions                           | Bool
+
+    Return: symmetries of the board                                    | tuple[Symmetry]
+    """
+    symmetries = _board_symmetries.get((rows, cols))
+    if symmetries is None:
+        symmetries = []
+        for swap_colors in (False, True):
+            for name, transform in _geometric_transforms(rows, cols):
+                squares = []
+                for row in range(rows):
+                    for col in range(cols):
+                        n_row, n_col = transform(row, col)
+                        squares.append(n_row * cols + n_col)
+                if swap_colors:
+                    name += "+swap"
+                symmetries.append(Symmetry(rows, cols, name, squares, swap_colors))
+        symmetries = tuple(symmetries)
+        _board_symmetries[(rows, cols)] = symmetries
+    if color_swap:
+        return symmetries
+    return tuple(symmetry for symmetry in symmetries if not symmetry.swap_colors)
+
+
+def goal_stabilizer(goal_board, match_turn=True):
+    """
+    Symmetries that leave the goal unchanged
+    Only these keep every state's distance to the goal, so only these
+    can merge states in a search
+    Arg1: goal board                                                   | ChessBoard/BitBoard
+    Arg2: goal test covers the side to move                            | Bool
+
+    Return: symmetries fixing the goal, identity first                 | tuple[Symmetry]
+    """
+    squares = goal_board.rows * goal_board.cols
+    compare_bits = (1 << (2 * squares + 1)) - 1
+    if not match_turn:
+        compare_bits >>= 1
+    goal_key = goal_board.state_key & compare_bits
+    return tuple(
+        symmetry
+        for symmetry in board_symmetries(goal_board.rows, goal_board.cols)
+        if symmetry.apply_key(goal_board.state_key) & compare_bits == goal_key
+    )
+
+
+def canonical_pair(start_board, goal_board):
+    """
+    Normalizes a (start, goal) pair under the whole symmetry group
+    Every symmetric copy of a puzzle gives the same keys
+    Arg1: start board                                                  | ChessBoard/BitBoard
+    Arg2: goal board                                                   | ChessBoard/BitBoard
+
+    Return: smallest (start key, goal key) and the symmetry giving it  | tuple, Symmetry
+    """
+    best = None
+    best_symmetry = None
+    for symmetry in board_symmetries(start_board.rows, start_board.cols):
+        pair = (
+            symmetry.apply_key(start_board.state_key),
+            symmetry.apply_key(goal_board.state_key),
+        )
+        if best is None or pair < best:
+            best = pair
+            best_symmetry = symmetry
+    return best, best_symmetry
+
+
+class SymmetryKey:
+    """
+    Drop in state_key function for the searches
+    Maps a board to the smallest key among its copies under the goal's stabilizer,
+    so symmetric copies share one closed set entry.
+    Call it as state_key(board)
+    Attributes:
+        symmetries (tuple): Symmetries fixing the goal, identity first
+    """
+
+    def __init__(self, goal_board, match_turn=True):
+        # the identity adds nothing to the minimum
+        self.symmetries = goal_stabilizer(goal_board, match_turn)
+        self._others = self.symmetries[1:]
+
+    def __call__(self, board) -> int:
+        key = board.state_key
+        best = key
+        for symmetry in self._others:
+            other = symmetry.apply_key(key)
+            if other < best:
+                best = other
+        return best